@@ -7,6 +7,12 @@ import pyaudio
 import wave
 import threading
 
+from speech.capture import CallbackCapture
+from speech.live import LiveSession
+from speech.preprocess import trim_silence
+from speech.scheduler import Priority, scheduler
+from speech.transcript import TranscriptBuffer
+
 load_dotenv()
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
@@ -15,7 +21,18 @@ client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000  # 16kHz for speech input
-CHUNK = 1024
+FRAME_MS = 20  # capture frame size, 10-20 ms keeps latency low
+END_OF_SPEECH_PAUSE = 1.0  # s of trailing silence the server needs to end a turn
+
+
+# live_connect: client.aio.live.connect, opened once the scheduler admits it
+def live_connect(model, config):
+    return scheduler.open(
+        "gemini",
+        model,
+        lambda: client.aio.live.connect(model=model, config=config),
+        priority=Priority.LIVE,
+    )
 
 
 async def speech_to_text_demo():
@@ -42,7 +59,10 @@ async def speech_to_text_demo():
     print("🔴 Recording audio... (speak now)")
 
     try:
-        async with client.aio.live.connect(model=model, config=config) as session:
+        async with live_connect(model, config) as session:
+            # running transcript instead of printing and dropping each fragment
+            transcript = TranscriptBuffer()
+
             # Simulate sending audio (you'd capture real audio here)
             # For demo, we'll send a pre-recorded file if available
 
@@ -76,8 +96,10 @@ async def speech_to_text_demo():
                     response.server_content
                     and response.server_content.input_transcription
                 ):
-                    print(
-                        f"🎤 You said: '{response.server_content.input_transcription.text}'"
+                    show_transcription(
+                        transcript,
+                        response.server_content.input_transcription,
+                        "🎤 You said:",
                     )
 
                 # Gemini's text response
@@ -95,41 +117,51 @@ async def speech_to_text_demo():
         print(f"❌ Error: {e}")
 
 
+# show_transcription: add a fragment to `transcript` and print it
+def show_transcription(transcript, transcription, label):
+    """
+    Prints only the new fragment, and the whole turn once when it finishes:
+    re-printing turn.text per fragment costs O(turn length) each time.
+    """
+    turn = transcript.add(
+        transcription.text or "", finished=bool(transcription.finished)
+    )
+    print(f"{label} ...{transcription.text or ''}")
+    if turn.finished:
+        print(f"{label} '{turn.text}'")
+
+
 def convert_wav_to_pcm(wav_file_path):
     """
     Converts WAV file to raw PCM data for Gemini Live API.
+    Leading/trailing silence is trimmed and long pauses are shortened first,
+    then END_OF_SPEECH_PAUSE of silence is put back at the end: the server's
+    activity detection only ends the turn once it hears a pause.
     """
     with wave.open(wav_file_path, "rb") as wav_file:
         frames = wav_file.readframes(wav_file.getnframes())
-        return frames
+        sample_rate = wav_file.getframerate()
+        pcm, _ = trim_silence(frames, sample_rate)
+        return pcm + bytes(int(END_OF_SPEECH_PAUSE * sample_rate) * 2)
 
 
-def record_audio(duration=5, filename="recorded_audio.wav"):
+async def record_audio(duration=5, filename="recorded_audio.wav"):
     """
     Records audio from microphone and saves to file.
+    Uses callback-mode capture, so no thread blocks in stream.read().
     """
     print(f"🎤 Recording for {duration} seconds...")
 
-    p = pyaudio.PyAudio()
-
-    stream = p.open(
-        format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK
-    )
-
     frames = []
 
-    for i in range(0, int(RATE / CHUNK * duration)):
-        data = stream.read(CHUNK)
-        frames.append(data)
-
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+    async with CallbackCapture(sample_rate=RATE, frame_ms=FRAME_MS) as mic:
+        for _ in range(int(duration * 1000 / FRAME_MS)):
+            frames.append(await mic.read())
 
     # Save to file
     wf = wave.open(filename, "wb")
     wf.setnchannels(CHANNELS)
-    wf.setsampwidth(p.get_sample_size(FORMAT))
+    wf.setsampwidth(pyaudio.get_sample_size(FORMAT))
     wf.setframerate(RATE)
     wf.writeframes(b"".join(frames))
     wf.close()
@@ -159,10 +191,12 @@ async def live_microphone_to_text():
     )
 
     try:
-        async with client.aio.live.connect(model=model, config=config) as session:
+        async with live_connect(model, config) as session:
+            transcript = TranscriptBuffer()
+
             # Record a short audio clip
             print("📢 Speak now (5 seconds)...")
-            audio_file = record_audio(duration=5, filename="live_recording.wav")
+            audio_file = await record_audio(duration=5, filename="live_recording.wav")
 
             # Convert WAV to PCM and send
             pcm_data = convert_wav_to_pcm(audio_file)
@@ -179,8 +213,10 @@ async def live_microphone_to_text():
                     response.server_content
                     and response.server_content.input_transcription
                 ):
-                    print(
-                        f"📝 Transcription: '{response.server_content.input_transcription.text}'"
+                    show_transcription(
+                        transcript,
+                        response.server_content.input_transcription,
+                        "📝 Transcription:",
                     )
 
                 if response.text is not None:
@@ -212,7 +248,10 @@ async def continuous_speech_recognition():
     )
 
     try:
-        async with client.aio.live.connect(model=model, config=config) as session:
+        # resumable: keeps listening past the ~10 minute connection limit
+        async with LiveSession(client, model, config) as session:
+            transcript = TranscriptBuffer()
+
             chunk_count = 0
 
             while True:
@@ -221,7 +260,7 @@ async def continuous_speech_recognition():
                     chunk_filename = f"audio_chunk_{chunk_count}.wav"
                     print(f"🎤 Listening... (chunk {chunk_count})")
 
-                    record_audio(duration=3, filename=chunk_filename)
+                    await record_audio(duration=3, filename=chunk_filename)
 
                     # Convert to PCM and send audio chunk
                     pcm_data = convert_wav_to_pcm(chunk_filename)
@@ -244,6 +283,9 @@ async def continuous_speech_recognition():
                             if (
                                 transcription.strip()
                             ):  # Only print non-empty transcriptions
+                                transcript.add(transcription)
+                                # just the new fragment: re-printing the whole
+                                # turn every time would be quadratic
                                 print(f"📝 [{chunk_count}] You said: '{transcription}'")
 
                         # Break after getting transcription for this chunk
@@ -281,7 +323,9 @@ async def transcribe_audio_file():
     )
 
     try:
-        async with client.aio.live.connect(model=model, config=config) as session:
+        async with live_connect(model, config) as session:
+            transcript = TranscriptBuffer()
+
             try:
                 # Convert audio file to PCM format
                 pcm_data = convert_wav_to_pcm(audio_file)
@@ -297,8 +341,10 @@ async def transcribe_audio_file():
                         response.server_content
                         and response.server_content.input_transcription
                     ):
-                        print(
-                            f"📝 Transcription: '{response.server_content.input_transcription.text}'"
+                        show_transcription(
+                            transcript,
+                            response.server_content.input_transcription,
+                            "📝 Transcription:",
                         )
 
                     if response.text is not None:
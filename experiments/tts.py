@@ -8,6 +8,8 @@ import threading
 import queue
 import time
 
+from speech.scheduler import Priority, scheduler
+
 load_dotenv()
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
@@ -15,19 +17,24 @@ client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 # Non-streaming version (current)
 def simple_tts(text_input):
-    response = client.models.generate_content(
-        model="gemini-2.5-flash-preview-tts",
-        contents=text_input,
-        config=types.GenerateContentConfig(
-            response_modalities=["AUDIO"],
-            speech_config=types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                        voice_name="Kore",
+    response = scheduler.run_blocking(
+        "gemini",
+        "gemini-2.5-flash-preview-tts",
+        lambda: client.models.generate_content(
+            model="gemini-2.5-flash-preview-tts",
+            contents=text_input,
+            config=types.GenerateContentConfig(
+                response_modalities=["AUDIO"],
+                speech_config=types.SpeechConfig(
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name="Kore",
+                        )
                     )
-                )
+                ),
             ),
         ),
+        priority=Priority.LIVE,
     )
 
     data = response.candidates[0].content.parts[0].inline_data.data
@@ -52,19 +59,24 @@ def streaming_tts(long_text):
         for sentence in sentences:
             if sentence.strip():
                 try:
-                    response = client.models.generate_content(
-                        model="gemini-2.5-flash-preview-tts",
-                        contents=f"Say: {sentence}",
-                        config=types.GenerateContentConfig(
-                            response_modalities=["AUDIO"],
-                            speech_config=types.SpeechConfig(
-                                voice_config=types.VoiceConfig(
-                                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                        voice_name="Kore",
+                    response = scheduler.run_blocking(
+                        "gemini",
+                        "gemini-2.5-flash-preview-tts",
+                        lambda: client.models.generate_content(
+                            model="gemini-2.5-flash-preview-tts",
+                            contents=f"Say: {sentence}",
+                            config=types.GenerateContentConfig(
+                                response_modalities=["AUDIO"],
+                                speech_config=types.SpeechConfig(
+                                    voice_config=types.VoiceConfig(
+                                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                            voice_name="Kore",
+                                        )
                                     )
-                                )
+                                ),
                             ),
                         ),
+                        priority=Priority.LIVE,
                     )
 
                     audio_data = (
@@ -179,7 +191,12 @@ async def true_streaming_tts(text_input):
 
     try:
         # Use the Live API for true streaming
-        async with client.aio.live.connect(model=model, config=config) as session:
+        async with scheduler.open(
+            "gemini",
+            model,
+            lambda: client.aio.live.connect(model=model, config=config),
+            priority=Priority.LIVE,
+        ) as session:
             # Send the text
             await session.send_client_content(
                 turns={"role": "user", "parts": [{"text": text_input}]},
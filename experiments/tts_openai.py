@@ -4,6 +4,8 @@ from openai import AsyncOpenAI
 from openai.helpers import LocalAudioPlayer
 from dotenv import load_dotenv
 
+from speech.scheduler import Priority, scheduler
+
 load_dotenv()
 
 
@@ -11,12 +13,18 @@ openai = AsyncOpenAI()
 
 
 async def main() -> None:
-    async with openai.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="coral",
-        input="Today is a wonderful day to build something people love!",
-        instructions="Speak in a cheerful and positive tone.",
-        response_format="pcm",
+    # only opening the response is scheduled (and retried), not the playback
+    async with scheduler.open(
+        "openai",
+        "gpt-4o-mini-tts",
+        lambda: openai.audio.speech.with_streaming_response.create(
+            model="gpt-4o-mini-tts",
+            voice="coral",
+            input="Today is a wonderful day to build something people love!",
+            instructions="Speak in a cheerful and positive tone.",
+            response_format="pcm",
+        ),
+        priority=Priority.LIVE,
     ) as response:
         await LocalAudioPlayer().play(response)
 
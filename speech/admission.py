@@ -0,0 +1,216 @@
+import asyncio
+import contextlib
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from speech.diagnostics import LoopLagMonitor
+from speech.scheduler import scheduler
+
+
+@dataclass(frozen=True)
+class Capacity:
+    # admitted interviews, each holding a Live session
+    sessions: int = int(os.getenv("SPEECH_MAX_SESSIONS", "200"))
+    stt_outstanding: int = 64  # recognition calls in flight or queued
+    cpu: float = 0.85  # fraction of one core, all a single event-loop process gets
+    loop_lag: float = 0.05  # s, worst recent event-loop lag
+    max_queue: int = 500  # interviews waiting beyond this are turned away
+    admit_per_interval: int = 1  # admissions per update_interval, see _can_admit
+
+
+# optional work and the load at which it is dropped: hedged requests double
+# provider calls, so they go first; archiving can catch up later, so it goes last
+SHED_AT = {
+    "hedge": 0.5,
+    "prefetch": 0.7,
+    "archive": 0.85,
+}
+
+
+class Overloaded(Exception):
+    """
+    The admission queue is full; `retry_after` is the estimated wait in seconds.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"node overloaded, retry in ~{retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Per-node capacity gate for interviews.
+
+    Load is the worst of outstanding STT calls, CPU and event-loop lag, each
+    relative to its Capacity limit. New interviews are admitted while there is
+    a free session slot and load is below 1, at most `admit_per_interval` per
+    `update_interval`; otherwise they wait in a FIFO queue and are told their
+    position and estimated wait. Optional work checks shed()
+    first and is dropped as load rises (see SHED_AT), so admitted sessions keep
+    their turn latency.
+
+        async with admission.admit(on_wait=tell_candidate):
+            await interview(session)
+    """
+
+    def __init__(self, capacity=None, update_interval=1.0):
+        self.capacity = capacity or Capacity()
+        self.update_interval = update_interval
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.shed_counts = {kind: 0 for kind in SHED_AT}
+        self.monitor = None
+        self._queue = deque()  # futures of waiting interviews, oldest first
+        self._avg_duration = 600.0  # s, running mean of interview length
+        self._cpu_sample = (time.monotonic(), self._cpu_time())
+        self._cpu = 0.0
+        self._admit_times = deque()  # monotonic times of recent admissions
+
+    def start(self, monitor=None):
+        """
+        Start measuring loop lag (reusing `monitor` if diagnostics already run
+        one). Must be called from inside the event loop.
+        """
+        if monitor is None:
+            monitor = LoopLagMonitor()
+            monitor.on_stall = lambda stall: None  # measured, not reported
+            monitor.start()
+        self.monitor = monitor
+
+    @staticmethod
+    def _cpu_time():
+        times = os.times()
+        return times.user + times.system
+
+    def cpu(self):
+        """
+        CPU this process used since the last sample, in cores. The event loop
+        and the GIL cap a gateway process at about one core however many the
+        node has, so this is compared against one core, not os.cpu_count().
+        """
+        now = time.monotonic()
+        sampled_at, used = self._cpu_sample
+        if now - sampled_at >= 0.5:
+            cpu_time = self._cpu_time()
+            self._cpu = (cpu_time - used) / (now - sampled_at)
+            self._cpu_sample = (now, cpu_time)
+        return self._cpu
+
+    def load(self):
+        """
+        Worst resource utilisation relative to capacity; 1.0 means at the limit.
+        """
+        lag = self.monitor.recent_lag() if self.monitor is not None else 0.0
+        return max(
+            scheduler.outstanding("google-stt") / self.capacity.stt_outstanding,
+            self.cpu() / self.capacity.cpu,
+            lag / self.capacity.loop_lag,
+        )
+
+    def shed(self, kind):
+        """
+        True if optional work of `kind` (a SHED_AT key) should be skipped now.
+        """
+        if self.load() < SHED_AT[kind]:
+            return False
+        self.shed_counts[kind] += 1
+        return True
+
+    def _can_admit(self):
+        if self.active >= self.capacity.sessions or self.load() >= 1.0:
+            return False
+        # load trails admissions (CPU and lag are sampled every 0.5-1 s), so a
+        # dip below 1 must not let the whole queue in at once: pace admissions
+        # until the newcomers show up in the next samples
+        cutoff = time.monotonic() - self.update_interval
+        while self._admit_times and self._admit_times[0] <= cutoff:
+            self._admit_times.popleft()
+        return len(self._admit_times) < self.capacity.admit_per_interval
+
+    def _take_slot(self):
+        self.active += 1
+        self._admit_times.append(time.monotonic())
+
+    def estimate_wait(self, position):
+        """
+        Seconds until the interview at queue `position` (1 = next) gets a slot,
+        assuming the occupied slots turn over at the observed interview length.
+        """
+        departures_per_second = max(1, self.active) / self._avg_duration
+        return position / departures_per_second
+
+    def _pump(self):
+        while self._queue and self._can_admit():
+            waiter = self._queue.popleft()
+            if waiter.done():
+                continue  # gave up while queued
+            self._take_slot()
+            waiter.set_result(None)
+
+    async def _wait_for_slot(self, on_wait):
+        if len(self._queue) >= self.capacity.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.estimate_wait(len(self._queue) + 1))
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.append(waiter)
+        try:
+            while not waiter.done():
+                if on_wait is not None:
+                    position = self._queue.index(waiter) + 1
+                    await on_wait(position, self.estimate_wait(position))
+                # load is re-checked every interval, not only when a slot frees
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(asyncio.shield(waiter), self.update_interval)
+                self._pump()
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._leave()  # admitted in the same tick: give the slot back
+            else:
+                waiter.cancel()
+                with contextlib.suppress(ValueError):
+                    self._queue.remove(waiter)
+            raise
+
+    def _leave(self):
+        self.active -= 1
+        self._pump()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, on_wait=None):
+        """
+        Hold a session slot for the body of the `async with`, queueing first if
+        the node is full. `on_wait(position, estimated_wait)` is awaited while
+        queued. Raises Overloaded if the queue itself is full.
+        """
+        if not self._queue and self._can_admit():
+            self._take_slot()
+        else:
+            await self._wait_for_slot(on_wait)
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started
+            self._avg_duration += 0.1 * (duration - self._avg_duration)
+            self._leave()
+
+    def metrics(self):
+        return {
+            "active": self.active,
+            "queued": sum(1 for waiter in self._queue if not waiter.done()),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "load": self.load(),
+            "cpu": self.cpu(),
+            "loop_lag": self.monitor.recent_lag() if self.monitor else 0.0,
+            "stt_outstanding": scheduler.outstanding("google-stt"),
+            "shed": dict(self.shed_counts),
+        }
+
+
+# shared admission controller for the whole process
+admission = AdmissionController()
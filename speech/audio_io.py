@@ -0,0 +1,340 @@
+import asyncio
+import threading
+
+import speech_recognition as sr
+
+from speech.preprocess import StreamEnhancer
+
+# audio settings shared by every source and sink
+SAMPLE_WIDTH = 2  # int16
+CHANNELS = 1
+INPUT_SAMPLE_RATE = 16000  # candidate microphone
+INPUT_SAMPLE_RATES = (8000, 16000)  # accepted from clients
+OUTPUT_SAMPLE_RATE = 24000  # gemini live audio
+
+# per-session audio memory budget: every buffer below is allocated once at these
+# sizes, so a session's footprint doesn't grow with answer length
+SESSION_AUDIO_BYTES = 1024 * 1024
+INPUT_BACKLOG_SECONDS = 2.0  # unread microphone audio kept before dropping
+SEGMENT_SECONDS = 12.0  # longest stretch recognized in one piece
+OUTPUT_QUEUE_SECONDS = 1.0  # interviewer audio queued for the client
+LIVE_BACKLOG_SECONDS = 1.0  # reply audio received from Live, not yet played
+
+
+def pcm_bytes(seconds, sample_rate=INPUT_SAMPLE_RATE):
+    return int(seconds * sample_rate) * SAMPLE_WIDTH
+
+
+# input_buffer_bytes: a NetworkSource's fixed input ring plus segment buffer
+def input_buffer_bytes(sample_rate=INPUT_SAMPLE_RATE):
+    return pcm_bytes(INPUT_BACKLOG_SECONDS + SEGMENT_SECONDS, sample_rate)
+
+
+OUTPUT_QUEUE_BYTES = pcm_bytes(OUTPUT_QUEUE_SECONDS, OUTPUT_SAMPLE_RATE)
+LIVE_BACKLOG_BYTES = pcm_bytes(LIVE_BACKLOG_SECONDS, OUTPUT_SAMPLE_RATE)
+# what is left of the budget goes to pre-synthesized interviewer audio
+PREFETCH_BYTES = (
+    SESSION_AUDIO_BYTES
+    - input_buffer_bytes(max(INPUT_SAMPLE_RATES))
+    - OUTPUT_QUEUE_BYTES
+    - LIVE_BACKLOG_BYTES
+)
+
+
+class PcmRing:
+    """
+    Fixed-size byte ring for streaming PCM, allocated once.
+
+    With overwrite=False a full ring drops the incoming bytes (counted in
+    `dropped`), and one producer thread plus one consumer thread may use it
+    without a lock: each side only advances its own counter. overwrite=True
+    drops the oldest bytes instead and needs the caller to serialise access.
+    """
+
+    __slots__ = ("capacity", "dropped", "overwrite", "_data", "_read", "_written")
+
+    def __init__(self, capacity, overwrite=False):
+        self.capacity = capacity
+        self.dropped = 0
+        self.overwrite = overwrite
+        self._data = bytearray(capacity)
+        self._read = 0  # total bytes consumed
+        self._written = 0  # total bytes produced
+
+    def __len__(self):
+        return self._written - self._read
+
+    def write(self, data):
+        size = len(data)
+        free = self.capacity - len(self)
+        if size > free:
+            if not self.overwrite:
+                self.dropped += size
+                return
+            if size > self.capacity:
+                self.dropped += size - self.capacity
+                data = memoryview(data)[-self.capacity :]
+                size = self.capacity
+            lost = size - free
+            self.dropped += lost
+            self._read += lost
+        start = self._written % self.capacity
+        first = min(size, self.capacity - start)
+        self._data[start : start + first] = data[:first]
+        self._data[: size - first] = data[first:]
+        self._written += size
+
+    def read(self, size):
+        """
+        Up to `size` bytes from the oldest end, as a new bytes object.
+        """
+        size = min(size, len(self))
+        start = self._read % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._data[start : start + first])
+        if first < size:
+            data += self._data[: size - first]
+        self._read += size
+        return data
+
+    def clear(self):
+        self._read = self._written
+
+
+class PcmBuffer:
+    """
+    Preallocated, reusable append-only PCM buffer (e.g. one recognition
+    segment). take() copies the contents out and empties it for reuse.
+    """
+
+    __slots__ = ("capacity", "_data", "_size")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def room(self):
+        return self.capacity - self._size
+
+    def append(self, data):
+        size = min(len(data), self.room())
+        self._data[self._size : self._size + size] = data[:size]
+        self._size += size
+        return size
+
+    def take(self):
+        data = bytes(self._data[: self._size])
+        self._size = 0
+        return data
+
+    def clear(self):
+        self._size = 0
+
+
+class QueueStream:
+    """
+    PCM stream fed from the event loop (or another thread). Readable two ways:
+    blockingly by speech_recognition via read(), which returns b"" once closed
+    and drained (Recognizer.listen treats that as end of stream), or from the
+    loop via read_async(). Holds at most `capacity` bytes; when nobody is
+    reading (e.g. while the interviewer speaks) the oldest audio is dropped.
+    Audio is passed through `enhancer` (a StreamEnhancer), if given, as it is
+    fed, so every reader sees the cleaned signal.
+    """
+
+    def __init__(self, sample_width=SAMPLE_WIDTH, capacity=None, enhancer=None):
+        self.sample_width = sample_width
+        self.enhancer = enhancer
+        self._ring = PcmRing(capacity or pcm_bytes(INPUT_BACKLOG_SECONDS), True)
+        self._ready = threading.Condition()
+        self._waiter = None
+        self._closed = False
+
+    @property
+    def capacity(self):
+        return self._ring.capacity
+
+    @property
+    def dropped(self):
+        return self._ring.dropped
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None:
+            waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+
+    def feed(self, pcm):
+        if self.enhancer is not None:
+            pcm = self.enhancer.process(pcm)
+        with self._ready:
+            self._ring.write(pcm)
+            self._ready.notify()
+        self._wake()
+
+    # clear: drop buffered audio nobody has read yet
+    def clear(self):
+        with self._ready:
+            self._ring.clear()
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._wake()
+
+    # read: `size` is in frames, like pyaudio's Stream.read
+    def read(self, size):
+        wanted = size * self.sample_width
+        with self._ready:
+            while len(self._ring) < wanted and not self._closed:
+                self._ready.wait()
+            return self._ring.read(wanted)
+
+    async def read_async(self, size):
+        """
+        Up to `size` frames as soon as any audio is buffered; b"" once closed
+        and drained.
+        """
+        while True:
+            with self._ready:
+                if len(self._ring) or self._closed:
+                    return self._ring.read(size * self.sample_width)
+            self._waiter = asyncio.get_running_loop().create_future()
+            with self._ready:
+                ready = len(self._ring) or self._closed
+            if not ready:
+                await self._waiter
+            self._waiter = None
+
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class NetworkSource(sr.AudioSource):
+    """
+    speech_recognition AudioSource backed by PCM arriving over the network,
+    a drop-in replacement for sr.Microphone().
+    """
+
+    def __init__(self, sample_rate=INPUT_SAMPLE_RATE, chunk_size=1024, enhance=True):
+        if sample_rate not in INPUT_SAMPLE_RATES:
+            # buffers are preallocated from the rate, so it must stay in budget
+            raise ValueError(
+                f"unsupported sample rate {sample_rate!r}, "
+                f"expected one of {INPUT_SAMPLE_RATES}"
+            )
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = chunk_size
+        # noise suppression + AGC ahead of VAD and STT, state kept across turns
+        self.enhancer = StreamEnhancer(sample_rate) if enhance else None
+        self.stream = QueueStream(
+            SAMPLE_WIDTH, pcm_bytes(INPUT_BACKLOG_SECONDS, sample_rate), self.enhancer
+        )
+        # reused by every answer of the session for its recognition segments
+        self.segment_buffer = PcmBuffer(pcm_bytes(SEGMENT_SECONDS, sample_rate))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    @property
+    def sample_rate(self):
+        return self.SAMPLE_RATE
+
+    # read: next chunk for async consumers such as speech_to_text_async
+    async def read(self):
+        return await self.stream.read_async(self.CHUNK)
+
+    def resident_bytes(self):
+        return self.stream.capacity + self.segment_buffer.capacity
+
+    def feed(self, pcm):
+        self.stream.feed(pcm)
+
+    # clear: drop audio received before this turn (see QueueStream.clear)
+    def clear(self):
+        self.stream.clear()
+
+    def close(self):
+        self.stream.close()
+
+
+class PyAudioSink:
+    """
+    Local speaker output. pyaudio is imported lazily so headless nodes never
+    touch a sound device.
+    """
+
+    def __init__(self, sample_rate=OUTPUT_SAMPLE_RATE):
+        import pyaudio
+
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paInt16, channels=CHANNELS, rate=sample_rate, output=True
+        )
+
+    async def write(self, pcm):
+        # stream.write blocks until the device has consumed the audio
+        await asyncio.to_thread(self._stream.write, pcm)
+
+    async def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._pyaudio.terminate()
+
+
+class QueueSink:
+    """
+    Sink that hands PCM to a consumer coroutine (e.g. the gateway's sender).
+
+    Holds at most `max_bytes` of audio: write() waits for the consumer to make
+    room, handing longer audio over in slices (views, not copies).
+    """
+
+    def __init__(self, max_bytes=OUTPUT_QUEUE_BYTES):
+        self.queue = asyncio.Queue()
+        self.max_bytes = max_bytes
+        self.queued_bytes = 0
+        self._room = asyncio.Event()
+
+    async def write(self, pcm):
+        view = memoryview(pcm)
+        step = max(SAMPLE_WIDTH, self.max_bytes // 4 // SAMPLE_WIDTH * SAMPLE_WIDTH)
+        for start in range(0, len(view), step):
+            chunk = view[start : start + step]
+            while self.queued_bytes + len(chunk) > self.max_bytes:
+                self._room.clear()
+                await self._room.wait()
+            self.queue.put_nowait(chunk)
+            self.queued_bytes += len(chunk)
+
+    # get: next chunk for the consumer, None once closed
+    async def get(self):
+        pcm = await self.queue.get()
+        if pcm is not None:
+            self.queued_bytes -= len(pcm)
+            self._room.set()
+        return pcm
+
+    async def close(self):
+        self.queue.put_nowait(None)
+
+
+# local_speaker: lazily opened process-wide speaker sink
+_speaker = None
+
+
+def local_speaker():
+    global _speaker
+    if _speaker is None:
+        _speaker = PyAudioSink()
+    return _speaker
@@ -0,0 +1,137 @@
+import asyncio
+
+from speech.audio_io import (
+    CHANNELS,
+    INPUT_BACKLOG_SECONDS,
+    INPUT_SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    SEGMENT_SECONDS,
+    PcmBuffer,
+    PcmRing,
+    pcm_bytes,
+)
+from speech.preprocess import StreamEnhancer
+
+# 20 ms frames: low capture latency without flooding the loop with wake-ups
+FRAME_MS = 20
+
+
+class CallbackCapture:
+    """
+    Non-blocking microphone capture on a PyAudio callback-mode stream.
+
+    PortAudio calls _callback on its own audio thread with each frame; frames
+    are copied into a preallocated ring (single producer, single consumer, so
+    no lock is taken) and the loop is only woken when a reader is actually
+    parked. No thread ever sits in a blocking stream.read().
+
+        async with CallbackCapture(frame_ms=10) as mic:
+            async for frame in mic:
+                ...
+    """
+
+    def __init__(
+        self,
+        sample_rate=INPUT_SAMPLE_RATE,
+        frame_ms=FRAME_MS,
+        backlog_seconds=INPUT_BACKLOG_SECONDS,
+        enhance=True,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frames_per_buffer = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frames_per_buffer * SAMPLE_WIDTH
+        # bounded: a stalled consumer loses audio instead of all memory
+        self._ring = PcmRing(pcm_bytes(backlog_seconds, sample_rate))
+        self.segment_buffer = PcmBuffer(pcm_bytes(SEGMENT_SECONDS, sample_rate))
+        # runs in read(), on the loop - the portaudio callback only copies
+        self.enhancer = StreamEnhancer(sample_rate) if enhance else None
+        self._waiter = None
+        self._loop = None
+        self._pyaudio = None
+        self._stream = None
+        self._continue = None  # pyaudio.paContinue, set once pyaudio is imported
+        self._closed = False
+
+    async def start(self):
+        import pyaudio
+
+        self._loop = asyncio.get_running_loop()
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=CHANNELS,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback,
+        )
+        self._continue = pyaudio.paContinue
+        self._stream.start_stream()
+        return self
+
+    # _callback: runs on the portaudio thread - must never block
+    def _callback(self, in_data, frame_count, time_info, status):
+        self._ring.write(in_data)
+        waiter = self._waiter
+        if waiter is not None:
+            self._loop.call_soon_threadsafe(self._wake, waiter)
+        return None, self._continue
+
+    def _wake(self, waiter):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    @property
+    def dropped(self):
+        return self._ring.dropped // self.frame_bytes  # frames
+
+    def resident_bytes(self):
+        return self._ring.capacity + self.segment_buffer.capacity
+
+    async def read(self):
+        """
+        Next frame of int16 PCM (noise-suppressed unless enhance=False), or b""
+        once the capture is closed.
+        """
+        while len(self._ring) < self.frame_bytes:
+            if self._closed:
+                return self._ring.read(self.frame_bytes)
+            self._waiter = self._loop.create_future()
+            # re-check: a frame may have landed before the waiter was visible
+            if len(self._ring) < self.frame_bytes:
+                await self._waiter
+            self._waiter = None
+        frame = self._ring.read(self.frame_bytes)
+        if self.enhancer is not None:
+            frame = self.enhancer.process(frame)
+        return frame
+
+    # clear: drop captured frames nobody has read yet (consumer side, no lock)
+    def clear(self):
+        self._ring.clear()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.read()
+        if not frame:
+            raise StopAsyncIteration
+        return frame
+
+    def close(self):
+        self._closed = True
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._pyaudio.terminate()
+            self._stream = None
+        if self._waiter is not None:
+            self._wake(self._waiter)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
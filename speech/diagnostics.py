@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+
+class Stall:
+    """
+    One blocked stretch of the event loop, with stacks sampled while it was blocked.
+    """
+
+    __slots__ = ("started", "duration", "stacks")
+
+    def __init__(self, started):
+        self.started = started
+        self.duration = 0.0
+        self.stacks = []
+
+    def report(self):
+        # the last sample is the one taken deepest into the stall
+        stack = self.stacks[-1] if self.stacks else "<no sample>"
+        return f"🐢 Event loop blocked for {self.duration * 1000:.0f} ms in:\n{stack}"
+
+
+# callback_stack: the stack of whatever callback the loop is running, minus asyncio internals
+def callback_stack(frame):
+    summary = traceback.extract_stack(frame)
+    start = 0
+    for i, entry in enumerate(summary):
+        if entry.filename.endswith(os.path.join("asyncio", "events.py")):
+            start = i + 1
+    return "".join(traceback.format_list(summary[start:]))
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag watchdog, cheap enough to leave on in production.
+
+    A heartbeat coroutine wakes every `interval` seconds and records how late it
+    was scheduled (the loop lag). A daemon thread watches that heartbeat; when it
+    goes quiet for longer than `threshold`, something is running on the loop
+    without yielding - a blocking stream.write, a sync HTTP call - and the thread
+    samples the loop thread's stack so the offender shows up in the report.
+    """
+
+    def __init__(self, interval=0.02, threshold=0.1, window=3000, max_stalls=50):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = deque(maxlen=window)
+        self.stalls = deque(maxlen=max_stalls)
+        self.on_stall = lambda stall: print(stall.report())
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._running = False
+
+    def start(self):
+        """
+        Start monitoring the running loop. Must be called from inside it.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._running = True
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        ).start()
+
+    def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lags.append(now - expected)
+            self._beat = now
+
+    def _watch(self):
+        stall = None
+        while self._running:
+            time.sleep(self.interval)
+            silent_for = time.monotonic() - self._beat
+            if silent_for > self.threshold + self.interval:
+                if stall is None:
+                    stall = Stall(self._beat)
+                if len(stall.stacks) < 5:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    if frame is not None:
+                        stall.stacks.append(callback_stack(frame))
+                stall.duration = silent_for
+            elif stall is not None:
+                # the heartbeat is back: the stall is over, report it once
+                stall.duration = self._beat - stall.started
+                self.stalls.append(stall)
+                self.on_stall(stall)
+                stall = None
+
+    # recent_lag: worst lag over the last `samples` heartbeats (~1 s by default)
+    def recent_lag(self, samples=50):
+        if not self.lags:
+            return 0.0
+        return max(itertools.islice(reversed(self.lags), samples))
+
+    def stats(self):
+        lags = np.fromiter(self.lags, dtype=float) if self.lags else np.zeros(1)
+        return {
+            "lag_p50_ms": float(np.percentile(lags, 50)) * 1000,
+            "lag_p99_ms": float(np.percentile(lags, 99)) * 1000,
+            "lag_max_ms": float(lags.max()) * 1000,
+            "stalls": len(self.stalls),
+        }
+
+
+# start_if_enabled: turn the watchdog on when SPEECH_DIAGNOSTICS=1
+def start_if_enabled():
+    if os.getenv("SPEECH_DIAGNOSTICS", "") not in ("1", "true", "yes"):
+        return None
+    monitor = LoopLagMonitor(
+        threshold=float(os.getenv("SPEECH_LAG_THRESHOLD_MS", "100")) / 1000
+    )
+    monitor.start()
+    print("🩺 Event-loop lag watchdog enabled")
+    return monitor
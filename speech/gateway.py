@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import json
+import traceback
+import uuid
+
+import websockets
+
+from speech.admission import Overloaded, admission
+from speech.audio_io import (
+    INPUT_SAMPLE_RATE,
+    INPUT_SAMPLE_RATES,
+    OUTPUT_SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    NetworkSource,
+    QueueSink,
+)
+from speech.diagnostics import start_if_enabled
+
+# WebSocket audio gateway. Protocol, per connection (= one interview session):
+#   1. client sends a JSON text frame: {"session_id": "...", "sample_rate": 16000}
+#      (8000 or 16000; a malformed hello gets {"type": "error", ...} and a close)
+#   2. while the node is full the server sends
+#      {"type": "queued", "position": 3, "estimated_wait": 40} every second or so
+#      (or {"type": "busy", "retry_after": 300} and closes if even the queue is full),
+#      then {"type": "ready", "session_id": "...", "output_sample_rate": 24000}
+#   3. client streams binary frames of int16 mono PCM (microphone),
+#      server streams binary frames of int16 mono PCM (interviewer voice)
+#   4. either side may send {"type": "end"} or just close the socket; if the
+#      interview fails the server sends {"type": "error", ...} instead of "end"
+
+
+class AudioSession:
+    """
+    One remote candidate: `source` feeds speech_to_text_async, `sink` takes streaming_tts.
+    Input buffers, queued output and prefetched audio together stay within
+    SESSION_AUDIO_BYTES.
+    """
+
+    __slots__ = ("session_id", "source", "sink", "prefetch", "live")
+
+    def __init__(self, session_id, sample_rate=INPUT_SAMPLE_RATE):
+        self.session_id = session_id
+        self.source = NetworkSource(sample_rate=sample_rate)
+        self.sink = QueueSink()
+        self.prefetch = None  # the interview's PrefetchBuffer, if it uses one
+        self.live = None  # the interview's LiveSession, if it uses one
+
+    def resident_bytes(self):
+        """
+        Audio held in memory for this session: the fixed input and segment
+        buffers plus queued output, reply audio waiting in the Live session
+        and any prefetched interviewer audio.
+        """
+        total = self.source.resident_bytes() + self.sink.queued_bytes
+        if self.live is not None:
+            total += self.live.queued_bytes
+        if self.prefetch is not None:
+            total += self.prefetch.resident_bytes()
+        return total
+
+
+# sessions: every connected AudioSession by id, for memory reporting
+sessions = {}
+
+
+# resident_audio_bytes: per-session audio memory on this node
+def resident_audio_bytes():
+    return {sid: session.resident_bytes() for sid, session in sessions.items()}
+
+
+# _control: a text frame as a JSON object, or None if it isn't one
+def _control(message):
+    if isinstance(message, bytes):
+        return None
+    try:
+        control = json.loads(message)
+    except ValueError:
+        return None
+    return control if isinstance(control, dict) else None
+
+
+async def _send_error(websocket, message):
+    await websocket.send(json.dumps({"type": "error", "message": message}))
+
+
+async def _receive_audio(websocket, session):
+    carry = b""  # odd trailing byte of the last frame: samples may straddle frames
+    try:
+        async for message in websocket:
+            if isinstance(message, bytes):
+                if carry:
+                    message = carry + message
+                whole = len(message) - len(message) % SAMPLE_WIDTH
+                carry = message[whole:]
+                if whole:
+                    session.source.feed(message[:whole] if carry else message)
+            elif (_control(message) or {}).get("type") == "end":
+                break
+    finally:
+        session.source.close()
+
+
+async def _send_audio(websocket, session):
+    try:
+        while True:
+            pcm = await session.sink.get()
+            if pcm is None:
+                await websocket.send(json.dumps({"type": "end"}))
+                return
+            await websocket.send(pcm)
+    except websockets.ConnectionClosed:
+        pass  # candidate already hung up
+
+
+async def serve(interview, host="0.0.0.0", port=8765):
+    """
+    Run the gateway forever. `interview` is a coroutine function taking an
+    AudioSession; it runs once per connection and the connection closes when it
+    returns (or is torn down when the candidate disconnects).
+    """
+
+    async def handler(websocket):
+        hello = _control(await websocket.recv())
+        if hello is None:
+            await _send_error(websocket, "expected a JSON hello object")
+            return
+        session_id = hello.get("session_id") or uuid.uuid4().hex
+        if not isinstance(session_id, str):
+            await _send_error(websocket, "session_id must be a string")
+            return
+        sample_rate = hello.get("sample_rate", INPUT_SAMPLE_RATE)
+        if sample_rate not in INPUT_SAMPLE_RATES:
+            # session buffers are sized from the rate: never take it unchecked
+            await _send_error(
+                websocket, f"sample_rate must be one of {INPUT_SAMPLE_RATES}"
+            )
+            return
+
+        async def queued(position, estimated_wait):
+            await websocket.send(
+                json.dumps(
+                    {
+                        "type": "queued",
+                        "position": position,
+                        "estimated_wait": round(estimated_wait),
+                    }
+                )
+            )
+
+        try:
+            async with admission.admit(on_wait=queued):
+                # allocated only once admitted: queued candidates hold no audio
+                session = AudioSession(session_id, sample_rate=int(sample_rate))
+                await run_session(websocket, session)
+        except Overloaded as e:
+            print(f"🚫 Session {session_id} turned away: {e}")
+            await websocket.send(
+                json.dumps({"type": "busy", "retry_after": round(e.retry_after)})
+            )
+        except websockets.ConnectionClosed:
+            pass  # gave up while queued
+
+    async def run_session(websocket, session):
+        await websocket.send(
+            json.dumps(
+                {
+                    "type": "ready",
+                    "session_id": session.session_id,
+                    "output_sample_rate": OUTPUT_SAMPLE_RATE,
+                }
+            )
+        )
+        sessions[session.session_id] = session
+        print(f"🔌 Session {session.session_id} connected")
+
+        receiver = asyncio.create_task(_receive_audio(websocket, session))
+        sender = asyncio.create_task(_send_audio(websocket, session))
+        runner = asyncio.create_task(interview(session))
+        try:
+            # candidate hung up (receiver done) or interview finished (runner done)
+            await asyncio.wait({receiver, runner}, return_when=asyncio.FIRST_COMPLETED)
+            if runner.done() and runner.exception() is not None:
+                error = runner.exception()
+                print(f"❌ Session {session.session_id} interview failed: {error!r}")
+                traceback.print_exception(error)
+                sender.cancel()
+                await _send_error(websocket, "interview failed")
+            elif runner.done():
+                await session.sink.close()
+                await sender
+        finally:
+            for task in (receiver, sender, runner):
+                task.cancel()
+            session.source.close()
+            if sessions.get(session.session_id) is session:
+                del sessions[session.session_id]
+            print(f"👋 Session {session.session_id} closed")
+
+    # admission control always measures loop lag; share the watchdog if it's on
+    admission.start(start_if_enabled())
+
+    # pcm doesn't compress, so skip permessage-deflate and save the cpu
+    async with websockets.serve(handler, host, port, compression=None) as server:
+        print(f"🎧 Audio gateway listening on ws://{host}:{port}")
+        await server.serve_forever()
+
+
+# echo_interview: demo session - repeat back whatever the candidate says
+async def echo_interview(session):
+    from speech.stt import speech_to_text_async
+    from speech.tts import open_live_session, streaming_tts
+
+    # one resumable live session per interview - no setup pause per turn
+    async with open_live_session() as live:
+        session.live = live
+        while True:
+            text = await speech_to_text_async(session.source)
+            if text is None:
+                return
+            await streaming_tts(f"You said: {text}", sink=session.sink, live=live)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket audio gateway")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    asyncio.run(serve(echo_interview, host=args.host, port=args.port))
@@ -0,0 +1,326 @@
+import asyncio
+import contextlib
+import functools
+import time
+
+from google.genai import types
+
+from speech.audio_io import LIVE_BACKLOG_BYTES
+from speech.scheduler import Priority, scheduler
+
+# Resumable Gemini Live sessions for long interviews.
+#
+# A Live connection only lasts about ten minutes, and an interview's context
+# would outgrow the model's window well before its 45-60 minutes are up.
+# LiveSession keeps one logical session alive across connections:
+#   - context-window compression (a sliding window) keeps the context bounded;
+#   - the resumption handles the server sends are recorded as they arrive;
+#   - once the connection nears its lifetime (or the server sends GoAway, or it
+#     drops), a replacement resumed from the latest handle is opened in the
+#     background and swapped in between turns, so turns never wait on setup;
+#   - input the server never answered is replayed if a connection dies before
+#     the reply starts; a reply cut off part way raises ConnectionError rather
+#     than being played twice.
+# Received messages wait in a queue bounded by audio bytes (`max_bytes`): when
+# the consumer falls behind, pumping pauses and the websocket applies
+# backpressure, just as it would for a plain genai session.
+# It quacks like genai's AsyncSession (send_client_content, send_realtime_input,
+# receive), so existing session code works unchanged.
+
+CONNECTION_LIFETIME = 540  # s; refresh comfortably before the ~10 min limit
+
+# compress once the context reaches trigger_tokens, down to target_tokens
+COMPRESSION = types.ContextWindowCompressionConfig(
+    trigger_tokens=32_000,
+    sliding_window=types.SlidingWindow(target_tokens=16_000),
+)
+
+
+class _Dropped:
+    """
+    Queued for receive() when the active connection dies. `partial` is set if
+    part of the reply had already been delivered.
+    """
+
+    def __init__(self, connection, partial):
+        self.connection = connection
+        self.partial = partial
+
+
+class _Connection:
+    """
+    One websocket of a LiveSession and the task pumping its messages.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.stack = contextlib.AsyncExitStack()
+        self.session = None
+        self.pump = None
+        self.opened_at = time.monotonic()
+        self.going_away = False
+        self.closed = False
+        self.retiring = False
+        self.timer = None
+
+
+def _audio_bytes(message):
+    content = message.server_content
+    if content is None or content.model_turn is None:
+        return 0
+    return sum(
+        len(part.inline_data.data)
+        for part in content.model_turn.parts or ()
+        if part.inline_data is not None and part.inline_data.data
+    )
+
+
+class LiveSession:
+    """
+    Long-lived Live API session that survives connection limits and drops.
+
+        async with LiveSession(client, MODEL, CONFIG) as session:
+            await session.send_client_content(turns=..., turn_complete=True)
+            async for message in session.receive():
+                ...
+    """
+
+    def __init__(
+        self,
+        client,
+        model,
+        config,
+        lifetime=CONNECTION_LIFETIME,
+        max_bytes=LIVE_BACKLOG_BYTES,
+    ):
+        self.client = client
+        self.model = model
+        if config.context_window_compression is None:
+            config = config.model_copy(
+                update={"context_window_compression": COMPRESSION}
+            )
+        self.config = config
+        self.lifetime = lifetime
+        self.handle = None
+        self.resumptions = 0
+        self.max_bytes = max_bytes
+        self.queued_bytes = 0  # reply audio received but not yet read
+        self._messages = asyncio.Queue()
+        self._drained = asyncio.Event()
+        self._active = None
+        self._next = None  # task opening the replacement connection
+        self._next_handle = None
+        self._unanswered = []  # sends of the current turn, until turn_complete
+        self._delivered = False  # part of the current turn's reply was queued
+        self._switching = asyncio.Lock()
+
+    async def _open(self, handle, scheduled=False):
+        config = self.config.model_copy(
+            update={"session_resumption": types.SessionResumptionConfig(handle=handle)}
+        )
+        connection = _Connection(handle)
+
+        def connect():
+            return self.client.aio.live.connect(model=self.model, config=config)
+
+        if scheduled:
+            connect = functools.partial(
+                scheduler.open, "gemini", self.model, connect, priority=Priority.LIVE
+            )
+        try:
+            connection.session = await connection.stack.enter_async_context(connect())
+        except BaseException:
+            await connection.stack.aclose()
+            raise
+        connection.opened_at = time.monotonic()
+        connection.pump = asyncio.create_task(self._pump(connection))
+        # refresh on age even if no message arrives to prompt it
+        connection.timer = asyncio.get_running_loop().call_later(
+            self.lifetime, self._prepare
+        )
+        return connection
+
+    def _activate(self, connection):
+        old, self._active = self._active, connection
+        if connection.handle is not None:
+            self.resumptions += 1
+        return old
+
+    async def _retire(self, connection):
+        connection.retiring = True
+        connection.pump.cancel()
+        connection.timer.cancel()
+        with contextlib.suppress(Exception):
+            await connection.stack.aclose()
+
+    async def _pump(self, connection):
+        try:
+            while True:
+                async for message in connection.session.receive():
+                    self._observe(connection, message)
+                    while self.queued_bytes > self.max_bytes:
+                        self._drained.clear()
+                        await self._drained.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._lost(connection)
+
+    def _lost(self, connection):
+        if connection.closed:
+            return  # already reported
+        connection.closed = True
+        if connection is self._active and not connection.retiring:
+            partial = self._delivered
+            if partial:
+                # the reply can't be resumed part way, and replaying the input
+                # would repeat what was already delivered: give up on this turn
+                self._unanswered.clear()
+                self._delivered = False
+            self._messages.put_nowait(_Dropped(connection, partial))
+            self._prepare()
+
+    def _observe(self, connection, message):
+        if connection is not self._active:
+            return  # a replacement stays silent until it is swapped in
+        update = message.session_resumption_update
+        if update is not None:
+            # only resumable points are safe to switch connections at
+            if update.resumable and update.new_handle:
+                self.handle = update.new_handle
+                self._prepare()
+            return
+        if message.go_away is not None:
+            connection.going_away = True
+            self._prepare()
+            return
+        if message.server_content is not None:
+            if message.server_content.turn_complete:
+                self._unanswered.clear()
+                self._delivered = False
+            else:
+                self._delivered = True
+        self.queued_bytes += _audio_bytes(message)
+        self._messages.put_nowait(message)
+
+    def _due(self, connection):
+        return (
+            connection.closed
+            or connection.going_away
+            or time.monotonic() - connection.opened_at > self.lifetime
+        )
+
+    # _prepare: open the replacement connection in the background if it's time
+    def _prepare(self):
+        if self._active is None or not self.handle or not self._due(self._active):
+            return
+        if self._next is not None:
+            if self._next_handle == self.handle:
+                return
+            self._discard(self._next)  # resuming from a handle that moved on
+        self._next = asyncio.create_task(self._open(self.handle))
+        self._next_handle = self.handle
+
+    def _discard(self, task):
+        if not task.done():
+            task.cancel()  # _open closes the half-open connection
+        elif not task.cancelled() and task.exception() is None:
+            asyncio.create_task(self._retire(task.result()))
+
+    async def _connection(self):
+        """
+        Session to send on. A prepared replacement is swapped in between turns
+        once it is ready; if the current connection has died it is swapped in
+        (or a new connection opened) straight away and the turn's unanswered
+        input replayed on it.
+        """
+        async with self._switching:
+            dead = self._active.closed
+            ready = self._next
+            if ready is not None and (dead or (ready.done() and not self._unanswered)):
+                self._next = None
+                try:
+                    connection = await ready
+                except Exception as e:
+                    print(f"⚠️ Live session resumption failed: {e}")
+                    connection = None
+                if connection is not None and connection.handle == self.handle:
+                    await self._retire(self._activate(connection))
+                elif connection is not None:
+                    await self._retire(connection)
+            if self._active.closed:
+                # dropped with nothing prepared: resume (or restart) right here
+                await self._retire(self._activate(await self._open(self.handle)))
+            if dead:
+                await self._replay()
+            return self._active.session
+
+    async def _replay(self):
+        connection = self._active
+        try:
+            for method, kwargs in list(self._unanswered):
+                await getattr(connection.session, method)(**kwargs)
+        except Exception:
+            self._lost(connection)
+
+    async def _send(self, method, kwargs):
+        session = await self._connection()
+        connection = self._active
+        self._unanswered.append((method, kwargs))
+        try:
+            await getattr(session, method)(**kwargs)
+        except Exception:
+            # died under us: the next send or receive() resumes and replays this
+            self._lost(connection)
+
+    async def send_client_content(self, **kwargs):
+        await self._send("send_client_content", kwargs)
+
+    async def send_realtime_input(self, **kwargs):
+        await self._send("send_realtime_input", kwargs)
+
+    async def receive(self):
+        """
+        Server messages up to and including the next turn_complete, across
+        however many connections that takes. Raises ConnectionError if the
+        connection drops after part of the reply was delivered.
+        """
+        while True:
+            message = await self._messages.get()
+            if isinstance(message, _Dropped):
+                if message.partial:
+                    raise ConnectionError("live connection lost mid-reply")
+                if message.connection is self._active:
+                    try:
+                        await self._connection()  # resume and replay the turn
+                    except Exception:
+                        # the turn is given up: don't replay it into the next one
+                        self._unanswered.clear()
+                        self._delivered = False
+                        raise
+                continue  # else a send already moved on to a new connection
+            self.queued_bytes -= _audio_bytes(message)
+            self._drained.set()
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+    async def close(self):
+        if self._next is not None:
+            self._next.cancel()
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await self._retire(await self._next)
+            self._next = None
+        if self._active is not None:
+            await self._retire(self._active)
+            self._active = None
+
+    async def __aenter__(self):
+        # only the first connection waits on the scheduler: replacements are
+        # awaited by turns that already hold a "gemini" slot, and waiting for a
+        # second one there could deadlock a saturated lane
+        self._active = await self._open(self.handle, scheduled=True)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,422 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import websockets
+
+from speech.audio_io import INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, SAMPLE_WIDTH
+
+# Headless load generator.
+#
+#   python -m speech.loadgen --steps 10,50,100,200 --wav answers/*.wav
+#
+# Starts a gateway node in a child process (so its CPU can be measured on its
+# own), points its STT at a local fake Google speech endpoint and its Live TTS at
+# an in-process fake session, then ramps up simulated candidates. Each candidate
+# streams real-time PCM like a microphone would - WAV answers separated by
+# silence - and times how long the interviewer takes to start answering.
+
+FAKE_TRANSCRIPT = "this is a simulated candidate answer"
+
+
+# fake_stt_server: local stand-in for the google web speech v2 endpoint
+def fake_stt_server(latency, port=0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = '{"result":[]}\n' + json.dumps(
+                {
+                    "result": [
+                        {
+                            "alternative": [
+                                {"transcript": FAKE_TRANSCRIPT, "confidence": 0.9}
+                            ],
+                            "final": True,
+                        }
+                    ],
+                    "result_index": 0,
+                }
+            )
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body.encode())
+            except BrokenPipeError:
+                pass  # the node gave up on (or was torn down during) this request
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeLiveClient:
+    """
+    Quacks like genai.Client for client.aio.live.connect(): connecting takes
+    `setup_latency` seconds; each turn waits `latency` seconds, then streams
+    `seconds` of silence faster than real time and ends with a resumption handle.
+    Every connection opened is kept in `sessions`; drop() and go_away() on one
+    simulate the server cutting it off, and the next `refuse` connects fail.
+    """
+
+    def __init__(self, latency, setup_latency=0.0, seconds=2.0, chunk_seconds=0.1):
+        self.latency = latency
+        self.setup_latency = setup_latency
+        self.seconds = seconds
+        self.chunk_seconds = chunk_seconds
+        self.aio = self
+        self.live = self
+        self.sessions = []
+        self.refuse = 0
+
+    @contextlib.asynccontextmanager
+    async def connect(self, model, config):
+        await asyncio.sleep(self.setup_latency)
+        if self.refuse:
+            self.refuse -= 1
+            raise ConnectionRefusedError("fake live connect refused")
+        session = _FakeLiveSession(self)
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.close()
+
+
+class _FakeLiveSession:
+    def __init__(self, client):
+        self.client = client
+        self._outbox = asyncio.Queue()  # server -> client messages, like the socket
+        self._turns = []
+        self.chunks_sent = 0
+        self.closed = False
+
+    async def send_client_content(self, turns=None, turn_complete=True):
+        if self.closed:
+            raise ConnectionError("fake live connection closed")
+        self._turns.append(asyncio.create_task(self._reply()))
+
+    async def _reply(self):
+        from google.genai import types
+
+        await asyncio.sleep(self.client.latency)
+        chunk = bytes(int(OUTPUT_SAMPLE_RATE * self.client.chunk_seconds) * 2)
+        for _ in range(int(self.client.seconds / self.client.chunk_seconds)):
+            self._outbox.put_nowait(
+                types.LiveServerMessage(
+                    server_content=types.LiveServerContent(
+                        model_turn=types.Content(
+                            parts=[
+                                types.Part(
+                                    inline_data=types.Blob(
+                                        data=chunk,
+                                        mime_type=f"audio/pcm;rate={OUTPUT_SAMPLE_RATE}",
+                                    )
+                                )
+                            ]
+                        )
+                    )
+                )
+            )
+            self.chunks_sent += 1
+            await asyncio.sleep(self.client.chunk_seconds / 4)
+        for message in (
+            types.LiveServerMessage(
+                server_content=types.LiveServerContent(generation_complete=True)
+            ),
+            types.LiveServerMessage(
+                server_content=types.LiveServerContent(turn_complete=True)
+            ),
+            types.LiveServerMessage(
+                session_resumption_update=types.LiveServerSessionResumptionUpdate(
+                    new_handle=os.urandom(8).hex(), resumable=True
+                )
+            ),
+        ):
+            self._outbox.put_nowait(message)
+
+    # receive: same contract as genai's AsyncSession.receive - one turn per call
+    async def receive(self):
+        while True:
+            message = await self._outbox.get()
+            if message is None:
+                raise ConnectionError("fake live connection closed")
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+    def close(self):
+        self.closed = True
+        for turn in self._turns:
+            turn.cancel()
+        self._outbox.put_nowait(None)
+
+    # drop: the socket dies, as if the network or the server cut it
+    def drop(self):
+        self.close()
+
+    # go_away: the server announces it will close this connection soon
+    def go_away(self):
+        from google.genai import types
+
+        self._outbox.put_nowait(
+            types.LiveServerMessage(go_away=types.LiveServerGoAway(time_left="10s"))
+        )
+
+
+# run_node: child process entry point - a normal gateway wired to the fakes
+def run_node(port, tts_latency, tts_setup_latency):
+    import speech.tts
+    from speech.gateway import echo_interview, serve
+    from speech.scheduler import Limit, scheduler
+
+    speech.tts.client = FakeLiveClient(tts_latency, tts_setup_latency)
+    # the fakes have no quota; measure the node, not the provider limits
+    unlimited = Limit(rate=1e6, burst=1_000_000)
+    scheduler.provider_limits = {p: unlimited for p in scheduler.provider_limits}
+    scheduler.model_limits = {}
+
+    asyncio.run(serve(echo_interview, host="127.0.0.1", port=port))
+
+
+def load_answers(paths):
+    """
+    Read 16 kHz mono int16 WAVs; without any, fall back to synthetic "speech"
+    (noise with a ~4 Hz syllable envelope, so the dynamic energy threshold in
+    speech_to_text doesn't mistake it for steady background) so the tool runs
+    out of the box.
+    """
+    answers = []
+    for path in paths:
+        with wave.open(path, "rb") as wav_file:
+            if (
+                wav_file.getframerate() != INPUT_SAMPLE_RATE
+                or wav_file.getnchannels() != 1
+                or wav_file.getsampwidth() != SAMPLE_WIDTH
+            ):
+                raise ValueError(f"{path}: expected 16 kHz mono int16 WAV")
+            answers.append(wav_file.readframes(wav_file.getnframes()))
+    if not answers:
+        rng = np.random.default_rng(0)
+        for seconds in (3, 5, 8):
+            t = np.arange(INPUT_SAMPLE_RATE * seconds) / INPUT_SAMPLE_RATE
+            envelope = 0.1 + 0.9 * np.sin(np.pi * 4 * t) ** 2
+            samples = rng.normal(0, 3000, t.size) * envelope
+            answers.append(samples.astype(np.int16).tobytes())
+    return answers
+
+
+class Candidate:
+    """
+    One simulated remote candidate. Streams PCM in real time at `frame_ms`
+    granularity (silence between answers) and records turn latency: end of the
+    candidate's speech -> first byte of interviewer audio.
+    """
+
+    def __init__(self, url, answers, turns, frame_ms, think_time):
+        self.url = url
+        self.answers = answers
+        self.turns = turns
+        self.frame_bytes = INPUT_SAMPLE_RATE * frame_ms // 1000 * SAMPLE_WIDTH
+        self.frame_seconds = frame_ms / 1000
+        self.think_time = think_time
+        self.latencies = []
+        self.errors = 0
+        self._pending = bytearray()
+        self._drained = asyncio.Event()
+        self._replied = asyncio.Event()
+
+    async def _send_frames(self, websocket):
+        silence = bytes(self.frame_bytes)
+        next_at = time.monotonic()
+        while True:
+            if self._pending:
+                frame = bytes(self._pending[: self.frame_bytes])
+                del self._pending[: self.frame_bytes]
+                if not self._pending:
+                    self._drained.set()
+            else:
+                frame = silence
+            await websocket.send(frame)
+            next_at += self.frame_seconds
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+    async def _receive(self, websocket):
+        async for message in websocket:
+            if isinstance(message, bytes):
+                self._replied.set()
+
+    async def run(self, reply_timeout):
+        try:
+            async with websockets.connect(self.url, compression=None) as websocket:
+                await websocket.send(json.dumps({"sample_rate": INPUT_SAMPLE_RATE}))
+                while True:
+                    reply = json.loads(await websocket.recv())
+                    if reply["type"] == "ready":
+                        break
+                    if reply["type"] == "busy":
+                        raise ConnectionRefusedError("node is full")
+                sender = asyncio.create_task(self._send_frames(websocket))
+                receiver = asyncio.create_task(self._receive(websocket))
+                try:
+                    # let the node calibrate on ambient silence first
+                    await asyncio.sleep(random.uniform(1.0, 2.0))
+                    for _ in range(self.turns):
+                        self._drained.clear()
+                        self._pending += random.choice(self.answers)
+                        await self._drained.wait()
+                        self._replied.clear()
+                        spoke_until = time.monotonic()
+                        await asyncio.wait_for(self._replied.wait(), reply_timeout)
+                        self.latencies.append(time.monotonic() - spoke_until)
+                        await asyncio.sleep(random.uniform(*self.think_time))
+                finally:
+                    sender.cancel()
+                    receiver.cancel()
+        except Exception:
+            self.errors += 1
+
+
+# cpu_seconds: user+system cpu time of a process, Linux only
+def cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except OSError:
+        return None
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    return float(np.percentile(values, pct))
+
+
+async def run_step(url, sessions, args, answers, node_pid):
+    candidates = [
+        Candidate(url, answers, args.turns, args.frame_ms, (0.5, 2.0))
+        for _ in range(sessions)
+    ]
+    cpu_before = cpu_seconds(node_pid)
+    started = time.monotonic()
+    await asyncio.gather(*(c.run(args.reply_timeout) for c in candidates))
+    wall = time.monotonic() - started
+    cpu_after = cpu_seconds(node_pid)
+
+    latencies = [latency for c in candidates for latency in c.latencies]
+    cores = None
+    if cpu_before is not None and cpu_after is not None:
+        cores = (cpu_after - cpu_before) / wall
+    return {
+        "sessions": sessions,
+        "turns": len(latencies),
+        "errors": sum(c.errors for c in candidates),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else float("nan"),
+        "cores": cores,
+        "sessions_per_core": sessions / cores if cores else None,
+    }
+
+
+def print_report(results, slo):
+    print()
+    print("sessions  turns  errors    p50     p95     p99   node cores  sessions/core")
+    for r in results:
+        cores = f"{r['cores']:.2f}" if r["cores"] is not None else "n/a"
+        per_core = f"{r['sessions_per_core']:.0f}" if r["sessions_per_core"] else "n/a"
+        print(
+            f"{r['sessions']:>8} {r['turns']:>6} {r['errors']:>7} "
+            f"{r['p50']:>6.2f}s {r['p95']:>6.2f}s {r['p99']:>6.2f}s "
+            f"{cores:>11} {per_core:>14}"
+        )
+
+    healthy = [r for r in results if r["p95"] <= slo and not r["errors"]]
+    broken = [r for r in results if r["p95"] > slo or r["errors"]]
+    print()
+    if healthy:
+        best = max(healthy, key=lambda r: r["sessions"])
+        print(
+            f"✅ Sustained {best['sessions']} concurrent sessions within p95 <= {slo}s"
+        )
+    if broken:
+        print(f"❌ SLO breaks at {broken[0]['sessions']} concurrent sessions")
+    else:
+        print("✅ SLO held at every step - try larger steps")
+
+
+async def run_load(args):
+    answers = load_answers(args.wav)
+    stt_server = fake_stt_server(args.stt_latency)
+    env = dict(
+        os.environ,
+        GOOGLE_STT_ENDPOINT=f"http://127.0.0.1:{stt_server.server_port}/recognize",
+        GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "loadgen"),
+    )
+    node = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "speech.loadgen",
+            "--node",
+            "--port",
+            str(args.port),
+            "--tts-latency",
+            str(args.tts_latency),
+            "--tts-setup-latency",
+            str(args.tts_setup_latency),
+        ],
+        env=env,
+    )
+    url = f"ws://127.0.0.1:{args.port}"
+    try:
+        await asyncio.sleep(2.0)  # let the node import and bind
+        results = []
+        for sessions in args.steps:
+            print(f"🚀 Ramping to {sessions} concurrent candidates...")
+            results.append(await run_step(url, sessions, args, answers, node.pid))
+        print_report(results, args.slo)
+    finally:
+        node.terminate()
+        node.wait()
+        stt_server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many remote candidates")
+    parser.add_argument("--steps", default="10,25,50,100,200")
+    parser.add_argument("--wav", nargs="*", default=[], help="16 kHz mono answers")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--frame-ms", type=int, default=100)
+    parser.add_argument("--slo", type=float, default=3.0, help="p95 turn latency, s")
+    parser.add_argument("--reply-timeout", type=float, default=30.0)
+    parser.add_argument("--stt-latency", type=float, default=0.3)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--tts-setup-latency", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8877)
+    parser.add_argument("--node", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.node:
+        run_node(args.port, args.tts_latency, args.tts_setup_latency)
+    else:
+        args.steps = [int(step) for step in args.steps.split(",")]
+        asyncio.run(run_load(args))
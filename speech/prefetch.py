@@ -0,0 +1,122 @@
+import asyncio
+import re
+from collections import OrderedDict
+
+from speech.admission import admission
+from speech.audio_io import PREFETCH_BYTES
+
+# short replies the interviewer uses between almost every pair of questions
+ACKNOWLEDGEMENTS = [
+    "Got it, thanks.",
+    "Okay, that makes sense.",
+    "Great, let's move on to the next question.",
+    "Could you elaborate a bit more on that?",
+]
+
+
+def _key(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class PrefetchBuffer:
+    """
+    Per-session store of interviewer audio synthesized ahead of time.
+
+    While the candidate is answering, call prefetch() with the utterances the
+    interviewer is likely to say next. Each one is synthesized in a background
+    task; streaming_tts() then take()s the audio and plays it at once.
+
+    Bounded by entry count and total PCM bytes (by default what the session's
+    audio budget leaves over, see audio_io) - the least recently requested
+    entries are evicted (and cancelled if still rendering) first.
+    """
+
+    def __init__(self, synthesize=None, max_entries=8, max_bytes=PREFETCH_BYTES):
+        if synthesize is None:
+            from speech.tts import synthesize
+        self.synthesize = synthesize
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> asyncio.Task[bytes]
+
+    # resident_bytes: pcm held by finished entries
+    def resident_bytes(self):
+        return sum(
+            len(task.result())
+            for task in self._entries.values()
+            if task.done() and not task.cancelled() and task.exception() is None
+        )
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            len(self._entries) > 1 and self.resident_bytes() > self.max_bytes
+        ):
+            _, task = self._entries.popitem(last=False)
+            task.cancel()
+
+    def prefetch(self, texts):
+        """
+        Start synthesizing each of `texts` that is not already buffered.
+        Must be called from inside the session's event loop. Skipped entirely
+        while the node is shedding optional work - the live path still speaks.
+        """
+        if admission.shed("prefetch"):
+            return
+        for text in texts:
+            key = _key(text)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                continue
+            task = asyncio.create_task(self.synthesize(text))
+            # failed prefetches are simply dropped - the live path will retry
+            task.add_done_callback(lambda t, key=key: self._on_done(key, t))
+            self._entries[key] = task
+        self._evict()
+
+    # prefetch_next: the next scripted question plus the common acknowledgements
+    def prefetch_next(self, next_question=None):
+        texts = list(ACKNOWLEDGEMENTS)
+        if next_question:
+            texts.insert(0, next_question)
+        self.prefetch(texts)
+
+    def _on_done(self, key, task):
+        if task.cancelled() or task.exception() is not None:
+            if self._entries.get(key) is task:
+                del self._entries[key]
+            return
+        self._evict()
+
+    def take(self, text):
+        """
+        Return the buffered audio for `text`, or None if it is missing or still
+        rendering (in which case the render is cancelled so it doesn't compete
+        with the live synthesis for quota). Finished audio stays buffered, since
+        acknowledgements are said many times per interview.
+        """
+        key = _key(text)
+        task = self._entries.get(key)
+        if task is None or not task.done():
+            if task is not None:
+                del self._entries[key]
+                task.cancel()
+            self.misses += 1
+            return None
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return task.result()
+
+    def cancel(self):
+        """
+        Cancel every pending render and drop all audio, e.g. when the interview
+        goes off-script or the session ends.
+        """
+        for task in self._entries.values():
+            task.cancel()
+        self._entries.clear()
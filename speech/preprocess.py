@@ -0,0 +1,273 @@
+import numpy as np
+
+
+class OffsetMap:
+    """
+    Maps times in trimmed audio back to the original recording, so word
+    timestamps from the recognizer still line up with the raw capture.
+    Each segment is (trimmed_start, original_start, length), in samples.
+    """
+
+    def __init__(self, segments, sample_rate):
+        self.segments = segments
+        self.sample_rate = sample_rate
+        self._starts = np.array([s[0] for s in segments] or [0])
+
+    def to_original(self, seconds):
+        sample = int(round(seconds * self.sample_rate))
+        if not self.segments:
+            return seconds
+        i = max(0, int(np.searchsorted(self._starts, sample, side="right")) - 1)
+        trimmed_start, original_start, length = self.segments[i]
+        # clamp into the segment: a time inside a removed pause maps to its edge
+        offset = min(max(sample - trimmed_start, 0), length)
+        return (original_start + offset) / self.sample_rate
+
+
+def _runs(mask):
+    """
+    (start, end) index pairs of the True runs in a boolean array.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def trim_silence(pcm, sample_rate, threshold=300, frame_ms=20, pad=0.15, max_pause=0.6):
+    """
+    Drop leading/trailing silence and shorten internal pauses to `max_pause`
+    seconds, before the audio is uploaded for recognition.
+
+    `threshold` is an int16 RMS level, i.e. the same scale as a speech_recognition
+    energy_threshold. Up to `pad` seconds of silence are kept next to speech so
+    word onsets and tails aren't clipped; a shortened pause keeps half of
+    `max_pause` on each side, pad included, so no pause comes out longer than
+    `max_pause` (or its original length). Returns (trimmed_pcm, OffsetMap);
+    audio with no speech at all is returned unchanged. The recognizers only
+    return text for now, so callers drop the OffsetMap - it is there for when
+    word timestamps are reported.
+    """
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    frame = max(1, sample_rate * frame_ms // 1000)
+    count = samples.size // frame
+    if count == 0:
+        return pcm, OffsetMap([(0, 0, samples.size)], sample_rate)
+
+    frames = samples[: count * frame].reshape(count, frame).astype(np.float32)
+    voiced = np.sqrt(np.mean(frames * frames, axis=1)) > threshold
+    if not voiced.any():
+        return pcm, OffsetMap([(0, 0, samples.size)], sample_rate)
+
+    pad_frames = int(round(pad * 1000 / frame_ms))
+    half = int(round(max_pause * 1000 / frame_ms)) // 2
+    keep = voiced.copy()
+    gap_starts, gap_ends = _runs(~voiced)
+    for start, end in zip(gap_starts, gap_ends):
+        if start == 0:
+            keep[max(start, end - pad_frames) : end] = True  # lead-in before speech
+        elif end == count:
+            keep[start : start + pad_frames] = True  # tail after speech
+        elif end - start > 2 * half:
+            # cap internal pauses: half of max_pause on each side of the gap
+            keep[start : start + half] = True
+            keep[end - half : end] = True
+        else:
+            keep[start:end] = True
+
+    # a final partial frame belongs to the last frame's decision
+    starts, ends = _runs(keep)
+    segments = []
+    pieces = []
+    trimmed = 0
+    for start, end in zip(starts * frame, ends * frame):
+        if end == count * frame:
+            end = samples.size
+        segments.append((int(trimmed), int(start), int(end - start)))
+        pieces.append(samples[start:end])
+        trimmed += end - start
+    return np.concatenate(pieces).tobytes(), OffsetMap(segments, sample_rate)
+
+
+class StreamEnhancer:
+    """
+    Streaming noise suppression, high-pass filter and automatic gain control
+    for int16 mono PCM, run inline on every session ahead of VAD and STT.
+
+    Works on a short-time spectrum (sqrt-Hann windows, 50% overlap), so all of
+    the filtering is a per-bin gain:
+      - a high-pass ramp below `highpass_hz` removes rumble and mains hum;
+      - a per-bin noise estimate is averaged wherever the smoothed spectrum
+        sits near its running minimum (which rises only `noise_rise_db` per
+        second), so steady hum and fan noise are learned while speech is not;
+      - each bin is gated Wiener-style against that floor (never below
+        `floor_db`, to avoid musical noise);
+      - AGC nudges speech frames toward `target_rms`; gain is held during
+        pauses so the residual noise is never pumped up.
+    State carries across process() calls, which return exactly as many samples
+    as they are given. The spectrum is analysed `batch_ms` at a time, so the
+    output is delayed by one window plus a batch less one hop (80 ms at 16 kHz
+    with the defaults); VAD and STT don't notice, and it keeps the per-call
+    cost down for clients that send small frames.
+    """
+
+    max_batch = 64  # hops per unrolled recursion in _gains
+
+    def __init__(
+        self,
+        sample_rate,
+        frame_ms=32,
+        highpass_hz=90,
+        noise_rise_db=3.0,
+        floor_db=-20,
+        target_rms=3000,
+        max_gain_db=18,
+        batch_ms=64,
+    ):
+        self.sample_rate = sample_rate
+        self.frame = 1 << max(6, int(np.log2(sample_rate * frame_ms / 1000)))
+        self.hop = self.frame // 2
+        # periodic sqrt-Hann analysis + synthesis sums to one at 50% overlap
+        self.window = np.sqrt(np.hanning(self.frame + 1)[:-1]).astype(np.float32)
+
+        freqs = np.fft.rfftfreq(self.frame, 1 / sample_rate)
+        ramp = np.clip((freqs - highpass_hz / 2) / (highpass_hz / 2), 0, 1)
+        self.highpass = (0.5 - 0.5 * np.cos(np.pi * ramp)).astype(np.float32)
+
+        hops_per_second = sample_rate / self.hop
+        self.noise_rise = 10 ** (noise_rise_db / 10 / hops_per_second)
+        self.floor = 10 ** (floor_db / 20)
+        self.target_rms = target_rms
+        self.max_gain = 10 ** (max_gain_db / 20)
+        self._ramp = np.arange(self.hop, dtype=np.float32) / self.hop
+        self.batch = max(1, round(sample_rate * batch_ms / 1000 / self.hop))
+
+        self._input = np.zeros(0, dtype=np.float32)
+        self._pending = bytearray()  # int16 input not yet analysed
+        self._tail = np.zeros(self.hop, dtype=np.float32)  # overlap-add carry
+        # latency: one window plus the hops held back to fill a batch
+        self._output = bytearray(2 * (self.frame + (self.batch - 1) * self.hop))
+        self._smoothed = None
+        self._minimum = None
+        self._noise = None
+        self._gain = np.ones(freqs.size, dtype=np.float32)
+        self._unrolled = {}  # batch length -> recursion coefficients
+        self._level = float(target_rms)
+        self._agc = 1.0
+
+    def _gains(self, power):
+        """
+        Per-bin suppression gains for a batch of power spectra, updating the
+        noise floor frame by frame. Each recursion is unrolled over the batch
+        (closed form, cumulative min/max/product) rather than looped per hop.
+        """
+        if len(power) > self.max_batch:
+            # keep the unrolled scale factors (up to 0.6 ** -n) well in range
+            parts = [
+                self._gains(power[i : i + self.max_batch])
+                for i in range(0, len(power), self.max_batch)
+            ]
+            return np.concatenate([g for g, _ in parts]), np.concatenate(
+                [s for _, s in parts]
+            )
+        if self._noise is None:
+            self._smoothed = power[0].copy()
+            self._minimum = power[0].copy()
+            self._noise = power[0].copy()
+        if len(power) not in self._unrolled:
+            steps = np.arange(1, len(power) + 1)[:, None]
+            self._unrolled[len(power)] = (
+                0.7**steps,
+                np.tril(0.3 * 0.7 ** (steps - steps.T).astype(np.float64)),
+                self.noise_rise**steps,
+                0.6**steps,
+            )
+        decay, weights, rise, hold = self._unrolled[len(power)]
+
+        # smoothed_i = 0.7 smoothed_i-1 + 0.3 power_i
+        smoothed = decay * self._smoothed + weights @ power
+        # minimum_i = min(smoothed_i, minimum_i-1 * rise)
+        minimum = rise * np.minimum(
+            self._minimum, np.minimum.accumulate(smoothed / rise, axis=0)
+        )
+        # average the noise in bins that aren't clearly above their minimum:
+        # noise_i = keep_i noise_i-1 + (1 - keep_i) power_i
+        rate = 0.15 * (smoothed < 3 * minimum)
+        kept = np.cumprod(1 - rate, axis=0)
+        noise = kept * (self._noise + np.cumsum(rate * power / kept, axis=0))
+        # 2x over-subtraction: noise power fluctuates around its mean
+        gain = np.clip(1 - 2 * noise / (power + 1e-3), self.floor, 1)
+        # quick to open, slower to close - fewer isolated "musical" bins:
+        # gain_i = max(gain_i, 0.6 gain_i-1)
+        gains = hold * np.maximum(
+            self._gain, np.maximum.accumulate(gain / hold, axis=0)
+        )
+
+        self._smoothed = smoothed[-1].astype(np.float32)
+        self._minimum = minimum[-1].astype(np.float32)
+        self._noise = noise[-1].astype(np.float32)
+        self._gain = gains[-1].astype(np.float32)
+        speech = power.sum(axis=1) > 4 * noise.sum(axis=1)
+        return (gains * self.highpass).astype(np.float32), speech
+
+    def _apply_agc(self, hops, speech):
+        levels = np.sqrt(np.mean(hops * hops, axis=1))
+        targets = np.empty(len(hops) + 1, dtype=np.float32)
+        targets[0] = self._agc
+        # asymmetric and gated, so this one stays a loop - over plain floats
+        for i, (level, is_speech) in enumerate(zip(levels.tolist(), speech.tolist())):
+            if is_speech:
+                rate = 0.3 if level > self._level else 0.05
+                self._level += rate * (level - self._level)
+            gain = self.target_rms / max(self._level, 1.0)
+            targets[i + 1] = min(max(gain, 0.5), self.max_gain)
+        self._agc = float(targets[-1])
+        # ramp across each hop so gain changes never click
+        starts, ends = targets[:-1, None], targets[1:, None]
+        return hops * (starts + (ends - starts) * self._ramp)
+
+    def process(self, pcm):
+        # between batches this is only byte copying: per-call overhead, not
+        # the spectrum maths, is what costs most when clients send 10-20 ms
+        self._pending += pcm
+        available = self._input.size + len(self._pending) // 2
+        count = (available - self.frame) // self.hop + 1
+        if count >= self.batch:
+            samples = np.frombuffer(self._pending, dtype=np.int16).astype(np.float32)
+            self._input = np.concatenate([self._input, samples])
+            self._pending.clear()
+            frames = np.lib.stride_tricks.sliding_window_view(self._input, self.frame)[
+                :: self.hop
+            ][:count]
+            spectra = np.fft.rfft(frames * self.window, axis=1)
+            power = spectra.real**2 + spectra.imag**2
+            gains, speech = self._gains(power)
+            frames = np.fft.irfft(spectra * gains, n=self.frame, axis=1) * self.window
+
+            # overlap-add: each finished hop is a first half plus the previous
+            # frame's second half
+            heads, tails = frames[:, : self.hop], frames[:, self.hop :]
+            carried = np.vstack([self._tail[None, :], tails[:-1]])
+            hops = self._apply_agc(heads + carried, speech)
+            self._tail = tails[-1].copy()
+            self._output += np.clip(hops, -32768, 32767).astype(np.int16).tobytes()
+            self._input = self._input[count * self.hop :]
+
+        ready = bytes(self._output[: len(pcm)])
+        del self._output[: len(pcm)]
+        return ready
+
+
+class EnhancedStream:
+    """
+    Wraps a speech_recognition-style stream (read(frames) -> bytes) so that
+    everything read from it has been through a StreamEnhancer.
+    """
+
+    def __init__(self, stream, enhancer):
+        self.stream = stream
+        self.enhancer = enhancer
+
+    def read(self, size):
+        return self.enhancer.process(self.stream.read(size))
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,333 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+# Priority: lower value is dispatched first
+class Priority(IntEnum):
+    LIVE = 0  # a candidate is waiting on this turn right now
+    PREFETCH = 1  # speculative work that may save latency later
+    BATCH = 2  # archiving, reports, anything nobody is waiting on
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float  # sustained requests per second
+    burst: int  # bucket capacity
+    concurrency: int | None = None  # max in-flight calls, None = unbounded
+
+
+# default quotas, deliberately below the published free-tier limits
+PROVIDER_LIMITS = {
+    "gemini": Limit(rate=5.0, burst=10, concurrency=50),
+    "google-stt": Limit(rate=10.0, burst=20, concurrency=32),
+    "openai": Limit(rate=5.0, burst=10, concurrency=32),
+}
+
+MODEL_LIMITS = {
+    "gemini-2.5-flash-preview-native-audio-dialog": Limit(rate=3.0, burst=6),
+    "gemini-2.5-flash-preview-tts": Limit(rate=2.0, burst=4),
+    "gemini-2.0-flash-live-001": Limit(rate=3.0, burst=6),
+}
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Classic token bucket. Not locked - the owning Scheduler serialises access.
+    """
+
+    def __init__(self, limit):
+        self.rate = limit.rate
+        self.capacity = limit.burst
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # wait_time: seconds until a token is available, 0 if one is available now
+    def wait_time(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Lane:
+    """
+    Per-provider waiting room: a heap of (priority, seq, key, future).
+    """
+
+    def __init__(self, limit):
+        self.bucket = TokenBucket(limit)
+        self.concurrency = limit.concurrency
+        self.in_flight = 0
+        self.waiters = []
+        self.timer = None
+
+
+class _Stats:
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retries = 0
+        self.failures = 0
+
+    def observe(self, waited):
+        self.count += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+
+def is_retryable(exc):
+    """
+    Rate limits, transient server errors and dropped connections are worth retrying.
+    Works with google-genai APIError (.code), openai errors (.status_code) and plain
+    socket errors without importing any of those SDKs here.
+    """
+    status = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+# backoff_delay: "full jitter" exponential backoff
+def backoff_delay(attempt, base=0.5, cap=20.0):
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class Scheduler:
+    """
+    Central gate for every outbound provider call.
+
+    Each call needs a token from its provider bucket AND its model bucket, plus a
+    free concurrency slot on the provider. Waiting calls are released strictly by
+    Priority, so live turns never queue behind prefetch or batch work.
+    """
+
+    def __init__(self, provider_limits=None, model_limits=None):
+        self.provider_limits = dict(provider_limits or PROVIDER_LIMITS)
+        self.model_limits = dict(model_limits or MODEL_LIMITS)
+        self._lanes = {}
+        self._model_buckets = {}
+        self._stats = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _lane(self, provider):
+        lane = self._lanes.get(provider)
+        if lane is None:
+            limit = self.provider_limits.get(provider, Limit(rate=5.0, burst=10))
+            lane = self._lanes[provider] = _Lane(limit)
+        return lane
+
+    def _model_bucket(self, model):
+        if model not in self.model_limits:
+            return None
+        bucket = self._model_buckets.get(model)
+        if bucket is None:
+            bucket = self._model_buckets[model] = TokenBucket(self.model_limits[model])
+        return bucket
+
+    def _stat(self, provider, priority):
+        key = (provider, Priority(priority).name)
+        stat = self._stats.get(key)
+        if stat is None:
+            stat = self._stats[key] = _Stats()
+        return stat
+
+    # _try_take: consume provider + model tokens together, or report how long to wait
+    def _try_take(self, lane, model, now):
+        model_bucket = self._model_bucket(model)
+        wait = lane.bucket.wait_time(now)
+        if model_bucket is not None:
+            wait = max(wait, model_bucket.wait_time(now))
+        if wait > 0:
+            return wait
+        lane.bucket.take()
+        if model_bucket is not None:
+            model_bucket.take()
+        return 0.0
+
+    def _pump(self, provider):
+        lane = self._lanes[provider]
+        with self._lock:
+            lane.timer = None
+            while lane.waiters:
+                if lane.concurrency is not None and lane.in_flight >= lane.concurrency:
+                    return  # a finishing call will pump again
+                priority, _, model, future = lane.waiters[0]
+                if future.done():  # cancelled while queued
+                    heapq.heappop(lane.waiters)
+                    continue
+                wait = self._try_take(lane, model, time.monotonic())
+                if wait > 0:
+                    # head-of-line blocking is intended: lower priorities must not
+                    # steal the token the head is waiting for
+                    loop = future.get_loop()
+                    lane.timer = loop.call_later(wait, self._pump, provider)
+                    return
+                heapq.heappop(lane.waiters)
+                lane.in_flight += 1
+                future.set_result(None)
+
+    async def _acquire(self, provider, model, priority):
+        lane = self._lane(provider)
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            heapq.heappush(
+                lane.waiters, (int(priority), next(self._seq), model, future)
+            )
+            pending_timer = lane.timer
+        if pending_timer is not None:
+            pending_timer.cancel()
+        self._pump(provider)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # admitted and cancelled in the same tick: give the slot back
+            if future.done() and not future.cancelled():
+                self._release(provider)
+            raise
+
+    def _release(self, provider):
+        lane = self._lanes[provider]
+        with self._lock:
+            lane.in_flight -= 1
+        self._pump(provider)
+
+    async def run(self, provider, model, call, priority=Priority.BATCH, retries=3):
+        """
+        Await `call()` (a zero-arg coroutine function) once admitted, retrying
+        retryable failures with jittered exponential backoff.
+        """
+        stat = self._stat(provider, priority)
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            await self._acquire(provider, model, priority)
+            stat.observe(time.monotonic() - queued_at)
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= retries or not is_retryable(e):
+                    stat.failures += 1
+                    raise
+                stat.retries += 1
+            finally:
+                self._release(provider)
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    @contextlib.asynccontextmanager
+    async def open(self, provider, model, connect, priority=Priority.BATCH, retries=3):
+        """
+        `async with` the async context manager `connect()` returns (a Live
+        connection, a streaming response) once admitted. Only entering it is
+        scheduled and retried; the slot is released before the body runs, so
+        a long stream doesn't hold it and a failure mid-stream is not replayed.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+
+            async def enter():
+                return await stack.enter_async_context(connect())
+
+            yield await self.run(provider, model, enter, priority, retries)
+
+    def run_blocking(self, provider, model, call, priority=Priority.BATCH, retries=3):
+        """
+        Same as run() for synchronous callers (e.g. speech_recognition). Blocking
+        callers honour the buckets and backoff, but only queue behind async waiters
+        of a strictly higher priority.
+        """
+        lane = self._lane(provider)
+        stat = self._stat(provider, priority)
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            while True:
+                with self._lock:
+                    ahead = any(
+                        w[0] < priority and not w[3].done() for w in lane.waiters
+                    )
+                    busy = (
+                        lane.concurrency is not None
+                        and lane.in_flight >= lane.concurrency
+                    )
+                    wait = 0.05 if ahead or busy else 0.0
+                    if not wait:
+                        wait = self._try_take(lane, model, time.monotonic())
+                    if not wait:
+                        lane.in_flight += 1
+                        break
+                time.sleep(wait)
+            stat.observe(time.monotonic() - queued_at)
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= retries or not is_retryable(e):
+                    stat.failures += 1
+                    raise
+                stat.retries += 1
+            finally:
+                with self._lock:
+                    lane.in_flight -= 1
+                    head = lane.waiters[0][3] if lane.waiters else None
+                if head is not None:
+                    # wake async waiters on their own loop; if it has closed
+                    # there is nobody left to wake, and the call's own result
+                    # or exception must not be masked
+                    with contextlib.suppress(RuntimeError):
+                        head.get_loop().call_soon_threadsafe(self._pump, provider)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    # outstanding: calls to `provider` in flight or waiting to be admitted
+    def outstanding(self, provider):
+        lane = self._lanes.get(provider)
+        if lane is None:
+            return 0
+        with self._lock:
+            queued = sum(1 for *_, future in lane.waiters if not future.done())
+            return lane.in_flight + queued
+
+    def metrics(self):
+        """
+        Snapshot of queue depth, in-flight calls and wait times per provider/priority.
+        """
+        with self._lock:
+            queues = {}
+            for provider, lane in self._lanes.items():
+                depth = {p.name: 0 for p in Priority}
+                for priority, _, _, future in lane.waiters:
+                    if not future.done():
+                        depth[Priority(priority).name] += 1
+                queues[provider] = {"in_flight": lane.in_flight, "queued": depth}
+
+            waits = {}
+            for (provider, priority), stat in self._stats.items():
+                waits.setdefault(provider, {})[priority] = {
+                    "calls": stat.count,
+                    "avg_wait": stat.total_wait / stat.count if stat.count else 0.0,
+                    "max_wait": stat.max_wait,
+                    "retries": stat.retries,
+                    "failures": stat.failures,
+                }
+        return {"queues": queues, "waits": waits}
+
+
+# shared scheduler for the whole process
+scheduler = Scheduler()
@@ -0,0 +1,281 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import speech_recognition as sr
+
+from speech.audio_io import SEGMENT_SECONDS, PcmBuffer, PcmRing, pcm_bytes
+from speech.preprocess import trim_silence
+
+# recognition workers shared by every session - segments are short network calls
+pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="stt-segment")
+
+PRE_ROLL = 0.5  # seconds kept from before speech starts, so word onsets survive
+
+
+def _rms(buffer):
+    samples = np.frombuffer(buffer, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+# measure_ambient: rms level of the first `duration` seconds of an async source
+async def measure_ambient(source, duration=0.5):
+    levels = []
+    heard = 0.0
+    while heard < duration:
+        buffer = await source.read()
+        if not buffer:
+            break
+        levels.append(_rms(buffer))
+        heard += len(buffer) / (2 * source.sample_rate)
+    return sum(levels) / len(levels) if levels else 0.0
+
+
+class Endpointer:
+    """
+    Energy-based endpointing for one answer, fed a buffer at a time.
+
+    Whenever the candidate pauses for `split_pause` seconds after at least
+    `min_segment` seconds of audio, push() returns the segment so far so it can
+    be recognized while listening continues; a segment that fills `buffer`
+    (SEGMENT_SECONDS by default) is cut there and then. `done` is set after
+    `pause_threshold` seconds of silence; finish() then returns the last
+    segment, or None if it holds no speech. Pass the session's `buffer` (a
+    PcmBuffer) to reuse it across answers.
+    """
+
+    __slots__ = (
+        "energy_threshold",
+        "pause_threshold",
+        "split_pause",
+        "min_segment",
+        "timeout",
+        "bytes_per_second",
+        "started",
+        "done",
+        "_segment",
+        "_pre_roll",
+        "_elapsed",
+        "_segment_voiced",
+        "_silent_seconds",
+    )
+
+    def __init__(
+        self,
+        sample_rate,
+        energy_threshold,
+        pause_threshold=2.0,
+        split_pause=0.6,
+        min_segment=4.0,
+        timeout=15,
+        sample_width=2,
+        buffer=None,
+    ):
+        self.energy_threshold = energy_threshold
+        self.pause_threshold = pause_threshold
+        self.split_pause = split_pause
+        self.min_segment = min_segment
+        self.timeout = timeout
+        self.bytes_per_second = sample_rate * sample_width
+        self.started = False
+        self.done = False
+        if buffer is None:
+            buffer = PcmBuffer(pcm_bytes(SEGMENT_SECONDS, sample_rate))
+        buffer.clear()
+        self._segment = buffer
+        self._pre_roll = PcmRing(pcm_bytes(PRE_ROLL, sample_rate), overwrite=True)
+        self._elapsed = 0.0
+        self._segment_voiced = True
+        self._silent_seconds = 0.0
+
+    def _seconds(self, size):
+        return size / self.bytes_per_second
+
+    def _cut(self):
+        voiced = self._segment_voiced
+        self._segment_voiced = False
+        if not voiced:
+            self._segment.clear()
+            return None
+        return self._segment.take()
+
+    def push(self, buffer):
+        seconds = self._seconds(len(buffer))
+        voiced = _rms(buffer) > self.energy_threshold
+
+        if not self.started:
+            self._elapsed += seconds
+            if voiced:
+                self.started = True
+                self._segment.append(self._pre_roll.read(len(self._pre_roll)))
+                self._segment.append(buffer)
+                return None
+            # wait for speech to start, holding only the pre-roll
+            self._pre_roll.write(buffer)
+            if self.timeout and self._elapsed > self.timeout:
+                raise sr.WaitTimeoutError(
+                    "listening timed out while waiting for phrase to start"
+                )
+            return None
+
+        segment = None
+        if len(buffer) > self._segment.room():
+            # no pause long enough to split at: cut here to stay within budget
+            segment = self._cut()
+        self._segment.append(buffer)
+        if voiced:
+            self._silent_seconds = 0.0
+            self._segment_voiced = True
+        else:
+            self._silent_seconds += seconds
+
+        if self._silent_seconds >= self.pause_threshold:
+            self.done = True
+        elif (
+            segment is None
+            and self._silent_seconds >= self.split_pause
+            and self._seconds(len(self._segment)) >= self.min_segment
+        ):
+            segment = self._cut()
+        return segment
+
+    def finish(self):
+        if not self.started:
+            raise sr.WaitTimeoutError("audio stream ended before speech started")
+        self.done = True
+        return self._cut()
+
+
+def _stitch(texts):
+    text = " ".join(t for t in texts if t).strip()
+    if not text:
+        raise sr.UnknownValueError()
+    return text
+
+
+def _recognize_segment(recognize, pcm, sample_rate, threshold):
+    pcm, _ = trim_silence(pcm, sample_rate, threshold=threshold)
+    try:
+        return recognize(pcm, sample_rate)
+    except sr.UnknownValueError:
+        return ""  # a breath or a cough - nothing to add to the transcript
+
+
+async def _recognize_segment_async(recognize, pcm, sample_rate, threshold):
+    pcm, _ = trim_silence(pcm, sample_rate, threshold=threshold)
+    try:
+        return await recognize(pcm, sample_rate)
+    except sr.UnknownValueError:
+        return ""
+
+
+def recognize_while_listening(
+    source,
+    recognize,
+    energy_threshold,
+    pause_threshold=2.0,
+    split_pause=0.6,
+    min_segment=4.0,
+    timeout=15,
+):
+    """
+    Listen for one answer on `source` and recognize it in segments as it goes.
+
+    Segments cut at pauses (see Endpointer) are handed to the recognition pool
+    while listening continues, so by the time the answer ends only the last
+    short segment is still outstanding. Segment transcripts are stitched back
+    in order.
+
+    `recognize(pcm, sample_rate)` does the actual recognition (int16 mono PCM in,
+    text out). Raises sr.WaitTimeoutError if nobody starts talking within
+    `timeout` seconds and sr.UnknownValueError if nothing was understood.
+    """
+    endpointer = Endpointer(
+        source.SAMPLE_RATE,
+        energy_threshold,
+        pause_threshold,
+        split_pause,
+        min_segment,
+        timeout,
+        source.SAMPLE_WIDTH,
+        getattr(source, "segment_buffer", None),
+    )
+    futures = []
+
+    def submit(segment):
+        futures.append(
+            pool.submit(
+                _recognize_segment,
+                recognize,
+                segment,
+                source.SAMPLE_RATE,
+                energy_threshold,
+            )
+        )
+
+    while not endpointer.done:
+        buffer = source.stream.read(source.CHUNK)
+        if not buffer:
+            break
+        segment = endpointer.push(buffer)
+        if segment:
+            submit(segment)
+    segment = endpointer.finish()
+    if segment:
+        submit(segment)
+
+    return _stitch(f.result() for f in futures)
+
+
+async def recognize_while_listening_async(
+    source,
+    recognize,
+    energy_threshold,
+    pause_threshold=2.0,
+    split_pause=0.6,
+    min_segment=4.0,
+    timeout=15,
+):
+    """
+    recognize_while_listening for async frame sources (anything with
+    `sample_rate` and an `async read()` returning b"" at end of stream, e.g.
+    CallbackCapture or NetworkSource, whose `segment_buffer` is reused). `recognize` is a coroutine function;
+    each segment is recognized in its own task and no thread is held while
+    waiting for audio or for the recognizer. Cancelling the call cancels any
+    segments still in flight.
+    """
+    endpointer = Endpointer(
+        source.sample_rate,
+        energy_threshold,
+        pause_threshold,
+        split_pause,
+        min_segment,
+        timeout,
+        buffer=getattr(source, "segment_buffer", None),
+    )
+    tasks = []
+
+    def submit(segment):
+        tasks.append(
+            asyncio.create_task(
+                _recognize_segment_async(
+                    recognize, segment, source.sample_rate, energy_threshold
+                )
+            )
+        )
+
+    try:
+        while not endpointer.done:
+            buffer = await source.read()
+            if not buffer:
+                break
+            segment = endpointer.push(buffer)
+            if segment:
+                submit(segment)
+        segment = endpointer.finish()
+        if segment:
+            submit(segment)
+        return _stitch(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,160 @@
+import time
+
+# words per sealed chunk: big enough that joins are rare, small enough to stay cache friendly
+CHUNK_WORDS = 256
+
+
+class Word:
+    __slots__ = ("text", "start", "end")
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Word({self.text!r}, {self.start:.2f}-{self.end:.2f})"
+
+
+class Turn:
+    """
+    One candidate turn. Committed words live in `words` (for timestamps) and in
+    sealed text chunks (for cheap joins); the last few words stay in `tail`,
+    where later fragments may still extend or revise them.
+    """
+
+    __slots__ = (
+        "index",
+        "started",
+        "words",
+        "tail",
+        "finished",
+        "_chunks",
+        "_open",
+        "_text",
+    )
+
+    def __init__(self, index, started):
+        self.index = index
+        self.started = started
+        self.words = []
+        self.tail = []
+        self.finished = False
+        self._chunks = []  # sealed " ".join()s of CHUNK_WORDS words each
+        self._open = []  # committed words not yet sealed into a chunk
+        self._text = None  # cached committed text
+
+    def _commit(self, word):
+        self.words.append(word)
+        self._open.append(word.text)
+        if len(self._open) >= CHUNK_WORDS:
+            self._chunks.append(" ".join(self._open))
+            self._open = []
+        self._text = None
+
+    @property
+    def committed_text(self):
+        """
+        Whole committed text. Cached until the next commit, but building it
+        copies the turn: callers following a live turn should read `tail_text`
+        or the fragment they added instead of this on every update.
+        """
+        if self._text is None:
+            # one join over the chunks: sealing never copies the prefix
+            self._text = " ".join(self._chunks + [" ".join(self._open)]).strip()
+        return self._text
+
+    @property
+    def tail_text(self):
+        return " ".join(w.text for w in self.tail)
+
+    @property
+    def text(self):
+        return f"{self.committed_text} {self.tail_text}".strip()
+
+
+class TranscriptBuffer:
+    """
+    Running transcript for a Live API session, fed with
+    server_content.input_transcription fragments as they arrive.
+
+    Appending is amortised O(1) - no repeated string concatenation over a 45
+    minute interview - and `latest` is the current turn in O(1). Word timestamps
+    are seconds since the buffer was created; the Live API doesn't send word
+    timings, so each fragment's words are spread evenly between the previous
+    fragment's arrival and this one's.
+    """
+
+    def __init__(self, tail_words=3, clock=time.monotonic):
+        self.tail_words = tail_words
+        self.clock = clock
+        self.started = clock()
+        self.turns = []
+        self.version = 0  # bumped on every change, for consumers polling for updates
+        self._last_at = 0.0
+
+    def _now(self):
+        return self.clock() - self.started
+
+    @property
+    def latest(self):
+        return self.turns[-1] if self.turns else None
+
+    def _current(self, at=None):
+        if not self.turns or self.turns[-1].finished:
+            started = self._now() if at is None else at
+            self.turns.append(Turn(len(self.turns), started))
+        return self.turns[-1]
+
+    def add(self, fragment, finished=False, at=None):
+        """
+        Append a transcription fragment. Fragments that don't start with
+        whitespace continue the previous word ("inter" + "view").
+        """
+        at = self._now() if at is None else at
+        # a new turn starts at this fragment, never after it
+        turn = self._current(at)
+        pieces = fragment.split()
+        if pieces and turn.tail and not fragment[:1].isspace():
+            turn.tail[-1].text += pieces.pop(0)
+            turn.tail[-1].end = at
+
+        if pieces:
+            begin = max(self._last_at, turn.started)
+            step = (at - begin) / len(pieces)
+            for i, piece in enumerate(pieces):
+                turn.tail.append(Word(piece, begin + i * step, begin + (i + 1) * step))
+        self._last_at = at
+
+        while len(turn.tail) > self.tail_words:
+            turn._commit(turn.tail.pop(0))
+        if finished:
+            self.end_turn()
+        self.version += 1
+        return turn
+
+    def revise_tail(self, text, at=None):
+        """
+        Replace the still-revisable tail of the current turn with `text`.
+        """
+        turn = self._current()
+        begin = turn.tail[0].start if turn.tail else self._last_at
+        turn.tail = []
+        self._last_at = begin
+        return self.add(" " + text, at=at)
+
+    def end_turn(self):
+        """
+        Commit the tail; the next fragment starts a new turn.
+        """
+        if not self.turns or self.turns[-1].finished:
+            return
+        turn = self.turns[-1]
+        for word in turn.tail:
+            turn._commit(word)
+        turn.tail = []
+        turn.finished = True
+        self.version += 1
+
+    def text(self):
+        return "\n".join(turn.text for turn in self.turns)
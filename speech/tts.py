@@ -1,67 +1,135 @@
 import asyncio
+import contextlib
 from google.genai import types
 from google import genai
 from dotenv import load_dotenv
 import os
-import pyaudio
+
+from speech.audio_io import local_speaker
+from speech.live import COMPRESSION, LiveSession
+from speech.scheduler import Priority, scheduler
 
 load_dotenv()
 
 
-# audio settings
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RECEIVE_SAMPLE_RATE = 24000
+# gemini client
+client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
-# pyaudio: audio stream
-p = pyaudio.PyAudio()
 
-# default stream
-stream = p.open(format=FORMAT, channels=CHANNELS, rate=RECEIVE_SAMPLE_RATE, output=True)
+# live tts settings
+MODEL = "gemini-2.5-flash-preview-native-audio-dialog"
+CONFIG = types.LiveConnectConfig(
+    response_modalities=["AUDIO"],
+    system_instruction="Speak in a cheerful and positive tone.",
+    # long interviews: keep the context bounded instead of hitting the limit
+    context_window_compression=COMPRESSION,
+)
 
-# gemini client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+# open_live_session: one resumable live session for a whole interview
+def open_live_session():
+    """
+    Use as `async with open_live_session() as live:` and pass `live` to
+    streaming_tts, so every turn of the interview reuses one warm session.
+    """
+    return LiveSession(client, MODEL, CONFIG)
+
+
+# _turn_audio: send text_input on session and yield the reply's pcm chunks
+async def _turn_audio(session, text_input):
+    await session.send_client_content(
+        turns={"role": "user", "parts": [{"text": text_input}]},
+        turn_complete=True,
+    )
+    # read through turn_complete so a reused session starts the next turn clean
+    async for response in session.receive():
+        if response.data is not None:
+            yield response.data
+
+
+# live_audio_chunks: yield pcm chunks for text_input as the live api produces them
+async def live_audio_chunks(text_input, live=None):
+    """
+    Speaks on `live` (a LiveSession) when given, else on a one-off connection.
+    """
+    if live is not None:
+        async for chunk in _turn_audio(live, text_input):
+            yield chunk
+        return
+
+    # Use the Live API for true streaming
+    async with client.aio.live.connect(model=MODEL, config=CONFIG) as session:
+        async for chunk in _turn_audio(session, text_input):
+            yield chunk
+
+
+# synthesize: generate the complete pcm for text_input without playing it
+async def synthesize(text_input, priority=Priority.PREFETCH):
+    """
+    Used by the prefetch stage to render audio ahead of time. Runs at PREFETCH
+    priority by default so it never delays a live turn.
+    """
+
+    async def collect():
+        return b"".join([chunk async for chunk in live_audio_chunks(text_input)])
+
+    return await scheduler.run("gemini", MODEL, collect, priority=priority)
 
 
 # streaming_tts: generate audio from text using google tts
-async def streaming_tts(text_input):
+async def streaming_tts(text_input, prefetched=None, sink=None, live=None):
     """
     Uses Google's Live API for true streaming TTS.
     Chunks are generated automatically by the model - no manual splitting needed!
+    If `prefetched` (a PrefetchBuffer) already holds audio for this text, it is
+    played straight away instead. Audio goes to `sink` (an AudioSink such as a
+    gateway session's), defaulting to the local speaker. Pass the interview's
+    `live` session (see open_live_session) to skip per-turn connection setup.
     """
 
-    model = "gemini-2.5-flash-preview-native-audio-dialog"
-    config = types.LiveConnectConfig(
-        response_modalities=["AUDIO"],
-        system_instruction="Speak in a cheerful and positive tone.",
-    )
+    if sink is None:
+        sink = local_speaker()
+
+    if prefetched is not None:
+        audio = prefetched.take(text_input)
+        if audio is not None:
+            print("⚡ Playing pre-synthesized audio...")
+            await sink.write(audio)
+            return
 
     print("🎵 Starting true streaming TTS with Live API...")
 
-    try:
-        # Use the Live API for true streaming
-        async with client.aio.live.connect(model=model, config=config) as session:
-            # Send the text
-            await session.send_client_content(
-                turns={"role": "user", "parts": [{"text": text_input}]},
-                turn_complete=True,
-            )
+    async def start():
+        # connect, send and wait for the first chunk: nothing has been played
+        # yet, so on a one-off connection this part can be retried from scratch
+        chunks = live_audio_chunks(text_input, live)
+        try:
+            return await anext(chunks, None), chunks
+        except BaseException:
+            await chunks.aclose()
+            raise
 
+    try:
+        # live turn: the candidate is waiting, so jump ahead of prefetch/batch
+        # work. Only the start of the turn holds the scheduler slot; once audio
+        # is playing a failure is reported, not retried, so nothing is heard twice.
+        # A LiveSession replays its own unanswered input when it reconnects, so
+        # resending the text on top of that would play the reply twice
+        first, chunks = await scheduler.run(
+            "gemini",
+            MODEL,
+            start,
+            priority=Priority.LIVE,
+            retries=0 if live is not None else 3,
+        )
+        async with contextlib.aclosing(chunks):
+            if first is not None:
+                await sink.write(first)
             # Receive and play chunks as they arrive
-            async for response in session.receive():
-                if response.data is not None:
-                    # Play each chunk immediately as it arrives
-                    stream.write(response.data)
-
-                # Check if generation is complete
-                if hasattr(response, "server_content") and response.server_content:
-                    if (
-                        hasattr(response.server_content, "generation_complete")
-                        and response.server_content.generation_complete
-                    ):
-                        print("✅ Streaming complete!")
-                        break
-
+            async for chunk in chunks:
+                # Play each chunk immediately as it arrives
+                await sink.write(chunk)
+        print("✅ Streaming complete!")
     except Exception as e:
         print(f"❌ Error Generating Audio: {e}")
 
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import unittest
+
+from google.genai import types
+
+from speech.live import LiveSession
+from speech.loadgen import FakeLiveClient
+
+os.environ.setdefault("GEMINI_API_KEY", "test")  # speech.tts builds a client
+
+import speech.tts  # noqa: E402
+
+CONFIG = types.LiveConnectConfig(response_modalities=["AUDIO"])
+CHUNKS = 10  # per reply with the client below
+
+
+class LiveSessionTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Drives LiveSession through loadgen's fake Live client: drops, GoAway and
+    lifetime refreshes must neither hang a turn nor replay audio already heard.
+    """
+
+    async def asyncSetUp(self):
+        self.client = FakeLiveClient(
+            latency=0.05, setup_latency=0.02, seconds=0.5, chunk_seconds=0.05
+        )
+
+    def open(self, **kwargs):
+        return LiveSession(self.client, "fake-model", CONFIG, **kwargs)
+
+    async def turn(self, live, drop_after=None):
+        """
+        Run one turn, dropping the connection after `drop_after` chunks; returns
+        the number of audio chunks received.
+        """
+
+        async def run():
+            await live.send_client_content(
+                turns={"role": "user", "parts": [{"text": "hi"}]},
+                turn_complete=True,
+            )
+            if drop_after == 0:
+                self.client.sessions[-1].drop()
+            chunks = 0
+            async for message in live.receive():
+                if message.data is not None:
+                    chunks += 1
+                    if chunks == drop_after:
+                        self.client.sessions[-1].drop()
+            return chunks
+
+        chunks = await asyncio.wait_for(run(), timeout=5)
+        await asyncio.sleep(0.05)  # let the resumption handle arrive
+        return chunks
+
+    async def test_drop_before_reply_replays_input(self):
+        async with self.open() as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertEqual(await self.turn(live, drop_after=0), CHUNKS)
+            self.assertEqual(len(self.client.sessions), 2)
+            self.assertEqual(live.resumptions, 1)
+            self.assertEqual(await self.turn(live), CHUNKS)
+
+    async def test_drop_mid_reply_raises_instead_of_hanging(self):
+        async with self.open() as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            with self.assertRaises(ConnectionError):
+                await self.turn(live, drop_after=5)
+            # the next turn resumes on the replacement, without the lost reply
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertEqual(len(self.client.sessions), 2)
+            self.assertEqual(self.client.sessions[1].chunks_sent, CHUNKS)
+
+    async def test_drop_between_turns(self):
+        async with self.open() as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.client.sessions[0].drop()
+            await asyncio.sleep(0.05)
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertEqual(self.client.sessions[1].chunks_sent, CHUNKS)
+
+    async def test_go_away_switches_between_turns(self):
+        async with self.open() as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.client.sessions[0].go_away()
+            await asyncio.sleep(0.05)  # replacement opens in the background
+            self.assertEqual(len(self.client.sessions), 2)
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertTrue(self.client.sessions[0].closed)
+            self.assertEqual(self.client.sessions[0].chunks_sent, CHUNKS)
+            self.assertEqual(self.client.sessions[1].chunks_sent, CHUNKS)
+
+    async def test_lifetime_refresh(self):
+        async with self.open(lifetime=0.3) as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            await asyncio.sleep(0.4)
+            self.assertEqual(len(self.client.sessions), 2)
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertEqual(self.client.sessions[1].chunks_sent, CHUNKS)
+            self.assertEqual(live.resumptions, 1)
+
+    async def test_slow_consumer_bounds_queued_audio(self):
+        chunk = 2400  # bytes per fake reply chunk
+        async with self.open(max_bytes=2 * chunk) as live:
+            await live.send_client_content(
+                turns={"role": "user", "parts": [{"text": "hi"}]},
+                turn_complete=True,
+            )
+            peak = chunks = 0
+            async for message in live.receive():
+                await asyncio.sleep(0.03)  # a sink that can't keep up
+                peak = max(peak, live.queued_bytes)
+                chunks += message.data is not None
+            self.assertEqual(chunks, CHUNKS)
+            self.assertLessEqual(peak, 3 * chunk)
+            self.assertEqual(live.queued_bytes, 0)
+
+    async def test_failed_resume_gives_up_the_turn(self):
+        async with self.open() as live:
+            self.assertEqual(await self.turn(live), CHUNKS)
+            # the prepared replacement and the reconnect in receive() both fail
+            self.client.refuse = 2
+            with self.assertRaises(ConnectionRefusedError):
+                await self.turn(live, drop_after=0)
+            # the lost turn's text is not replayed into the next one
+            self.assertEqual(await self.turn(live), CHUNKS)
+            self.assertEqual(self.client.sessions[-1].chunks_sent, CHUNKS)
+            self.assertTrue(live._messages.empty())
+
+    async def test_streaming_tts_leaves_recovery_to_the_session(self):
+        class Sink:
+            chunks = 0
+
+            async def write(self, pcm):
+                self.chunks += 1
+
+        async def speak(live, drop=False):
+            sink = Sink()
+            if drop:
+                session = self.client.sessions[-1]
+                sent = len(session._turns)
+
+                async def drop_once_sent():
+                    while len(session._turns) == sent:
+                        await asyncio.sleep(0.001)
+                    session.drop()
+
+                dropper = asyncio.create_task(drop_once_sent())
+            await asyncio.wait_for(
+                speech.tts.streaming_tts("hi", sink=sink, live=live), 5
+            )
+            if drop:
+                dropper.cancel()
+            await asyncio.sleep(0.05)
+            return sink.chunks
+
+        speech.tts.client = self.client
+        async with speech.tts.open_live_session() as live:
+            self.assertEqual(await speak(live), CHUNKS)
+            self.client.refuse = 2
+            self.assertEqual(await speak(live, drop=True), 0)  # reported, not resent
+            self.assertEqual(await speak(live), CHUNKS)
+            self.assertEqual(await speak(live), CHUNKS)
+            self.assertTrue(live._messages.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()